@@ -8,183 +8,369 @@ including sector peers, supply chain relationships, and impact scoring.
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-import requests
-from datetime import datetime, timedelta
-import time
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple, Optional
+from http_session import YAHOO_SESSION
+from datetime import date, datetime
+import functools
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import warnings
-warnings.filterwarnings('ignore')
+
+# Closing prices are cached per (ticker, period) for the current day, both in
+# process memory and on disk so warm restarts skip the Yahoo round-trips.
+PRICE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'prices')
+
+# Upper bound in seconds on waiting for a batch of price fetches
+PRICE_FETCH_TIMEOUT = 30
+
+# Relationship categories, most specific display label first
+RELATIONSHIP_TYPES = ("sector_peers", "industry_peers", "competitors")
+
+_price_memo: Dict[Tuple[str, str], Tuple[str, pd.Series]] = {}
+_price_memo_lock = threading.Lock()
+
+# Long-lived pool for price downloads. Reusing its threads across analyses
+# avoids per-request thread start-up and caps concurrent Yahoo requests
+# process-wide, much like a shared semaphore would.
+_IO_POOL = ThreadPoolExecutor(max_workers=16)
+
+# Yahoo chart endpoint for close-only downloads
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+
+# Speculative background fetches, keyed like the price cache
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2)
+_pending_prefetches: Dict[Tuple[str, str], Future] = {}
+
+def _price_cache_path(ticker: str, period: str, day: str) -> str:
+    key = hashlib.sha1(f"{ticker}|{period}|{day}|close".encode()).hexdigest()
+    return os.path.join(PRICE_CACHE_DIR, day, f"{key}.pkl")
+
+def load_cached_prices(ticker: str, period: str) -> Optional[pd.Series]:
+    """Return today's cached closing prices for a stock, or None on a miss."""
+    day = date.today().isoformat()
+    with _price_memo_lock:
+        cached = _price_memo.get((ticker, period))
+    if cached and cached[0] == day:
+        return cached[1]
+    
+    path = _price_cache_path(ticker, period, day)
+    if not os.path.exists(path):
+        return None
+    try:
+        data = pd.read_pickle(path)
+    except Exception as e:
+        print(f"Error reading cached prices for {ticker}: {e}")
+        return None
+    
+    with _price_memo_lock:
+        _price_memo[(ticker, period)] = (day, data)
+    return data
+
+def store_cached_prices(ticker: str, period: str, data: pd.Series) -> None:
+    """Cache a stock's closing prices for the rest of the day."""
+    day = date.today().isoformat()
+    with _price_memo_lock:
+        _price_memo[(ticker, period)] = (day, data)
+    
+    path = _price_cache_path(ticker, period, day)
+    try:
+        day_dir = os.path.dirname(path)
+        if not os.path.isdir(day_dir):
+            # First write of a new day: drop the previous days' entries
+            if os.path.isdir(PRICE_CACHE_DIR):
+                for old_day in os.listdir(PRICE_CACHE_DIR):
+                    if old_day != day:
+                        shutil.rmtree(os.path.join(PRICE_CACHE_DIR, old_day), ignore_errors=True)
+            os.makedirs(day_dir, exist_ok=True)
+        
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        data.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error caching prices for {ticker}: {e}")
+
+def _fetch_close_direct(ticker: str, period: str) -> Optional[pd.Series]:
+    """Fetch adjusted daily closes straight from Yahoo's chart API, or None if it refuses."""
+    response = YAHOO_SESSION.get(
+        YAHOO_CHART_URL.format(ticker=ticker),
+        params={'range': period, 'interval': '1d'},
+        timeout=10
+    )
+    if response.status_code != 200:
+        return None
+    
+    result = (response.json().get('chart', {}).get('result') or [None])[0]
+    if not result or not result.get('timestamp'):
+        return None
+    
+    # Adjusted closes match yfinance's auto_adjust default; missing days arrive as null
+    indicators = result['indicators']
+    adjclose = indicators.get('adjclose')
+    closes = adjclose[0]['adjclose'] if adjclose else indicators['quote'][0]['close']
+    
+    # Shift UTC timestamps to the exchange's local calendar day
+    offset = result.get('meta', {}).get('gmtoffset', 0)
+    dates = pd.to_datetime(np.asarray(result['timestamp'], dtype=np.int64) + offset, unit='s').normalize()
+    close = pd.Series(np.asarray(closes, dtype=np.float32), index=dates, name=ticker).dropna()
+    return close if not close.empty else None
+
+def _fetch_and_cache(fetch, engine, ticker: str, period: str) -> Optional[pd.Series]:
+    data = fetch(engine, ticker, period)
+    if data is not None:
+        store_cached_prices(ticker, period, data)
+    return data
+
+def _forget_prefetch(key: Tuple[str, str]) -> None:
+    with _price_memo_lock:
+        _pending_prefetches.pop(key, None)
+
+def cached_price_data(fetch):
+    """Decorator serving closing prices from the daily cache before calling Yahoo."""
+    @functools.wraps(fetch)
+    def wrapper(self, ticker: str, period: str = "1y") -> Optional[pd.Series]:
+        data = load_cached_prices(ticker, period)
+        if data is not None:
+            return data
+        
+        # Join a background prefetch of the same ticker instead of fetching twice
+        with _price_memo_lock:
+            pending = _pending_prefetches.get((ticker, period))
+        if pending is not None:
+            try:
+                return pending.result(timeout=PRICE_FETCH_TIMEOUT)
+            except Exception as e:
+                print(f"Prefetch failed for {ticker}: {e}")
+        
+        return _fetch_and_cache(fetch, self, ticker, period)
+    return wrapper
+
+US_SECTOR_MAPPING = {
+    'Technology': ['AAPL', 'MSFT', 'GOOGL', 'META', 'NVDA', 'CRM', 'ORCL', 'ADBE', 'INTC', 'AMD'],
+    'Financial Services': ['JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'USB', 'PNC', 'TFC', 'COF'],
+    'Healthcare': ['JNJ', 'PFE', 'UNH', 'ABBV', 'MRK', 'TMO', 'ABT', 'DHR', 'BMY', 'AMGN'],
+    'Consumer Cyclical': ['AMZN', 'TSLA', 'HD', 'MCD', 'DIS', 'NKE', 'SBUX', 'LOW', 'TJX', 'BKNG'],
+    'Energy': ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'PSX', 'VLO', 'MPC', 'OXY', 'HAL'],
+    'Industrials': ['BA', 'CAT', 'GE', 'HON', 'UNP', 'LMT', 'MMM', 'FDX', 'UPS', 'RTX'],
+    'Basic Materials': ['LIN', 'APD', 'ECL', 'DD', 'DOW', 'FCX', 'NEM', 'VMC', 'MLM', 'PPG'],
+    'Real Estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'PSA', 'SPG', 'O', 'WELL', 'DLR', 'EXR'],
+    'Utilities': ['NEE', 'DUK', 'SO', 'AEP', 'EXC', 'XEL', 'SRE', 'D', 'PEG', 'PCG'],
+    'Consumer Defensive': ['PG', 'KO', 'PEP', 'WMT', 'COST', 'CL', 'KMB', 'GIS', 'K', 'CPB']
+}
+
+# Indian stock sector mapping
+INDIAN_SECTOR_MAPPING = {
+    'Technology': ['TCS.NS', 'INFY.NS', 'WIPRO.NS', 'HCLTECH.NS', 'TECHM.NS', 'LTI.NS', 'MINDTREE.NS'],
+    'Financial Services': ['HDFCBANK.NS', 'ICICIBANK.NS', 'SBIN.NS', 'AXISBANK.NS', 'KOTAKBANK.NS', 'INDUSINDBK.NS'],
+    'Energy': ['RELIANCE.NS', 'ONGC.NS', 'IOC.NS', 'BPCL.NS', 'HINDPETRO.NS', 'GAIL.NS'],
+    'Consumer Cyclical': ['MARUTI.NS', 'BAJAJ-AUTO.NS', 'M&M.NS', 'EICHERMOT.NS', 'HEROMOTOCO.NS'],
+    'Healthcare': ['SUNPHARMA.NS', 'DRREDDY.NS', 'CIPLA.NS', 'LUPIN.NS', 'BIOCON.NS', 'CADILAHC.NS'],
+    'Industrials': ['LT.NS', 'ULTRACEMCO.NS', 'ADANIENT.NS', 'ADANIPORTS.NS', 'TATASTEEL.NS'],
+    'Consumer Defensive': ['HINDUUNILV.NS', 'ITC.NS', 'NESTLEIND.NS', 'GODREJCP.NS', 'DABUR.NS']
+}
+
+# Peer groups keyed by (is_indian, sector), built once at import so lookups skip the mapping dicts
+_SECTOR_PEERS = {(False, sector): tuple(stocks) for sector, stocks in US_SECTOR_MAPPING.items()}
+_SECTOR_PEERS.update({(True, sector): tuple(stocks) for sector, stocks in INDIAN_SECTOR_MAPPING.items()})
 
 class StockCorrelationEngine:
     def __init__(self):
-        self.sector_mapping = {
-            'Technology': ['AAPL', 'MSFT', 'GOOGL', 'META', 'NVDA', 'CRM', 'ORCL', 'ADBE', 'INTC', 'AMD'],
-            'Financial Services': ['JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'USB', 'PNC', 'TFC', 'COF'],
-            'Healthcare': ['JNJ', 'PFE', 'UNH', 'ABBV', 'MRK', 'TMO', 'ABT', 'DHR', 'BMY', 'AMGN'],
-            'Consumer Cyclical': ['AMZN', 'TSLA', 'HD', 'MCD', 'DIS', 'NKE', 'SBUX', 'LOW', 'TJX', 'BKNG'],
-            'Energy': ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'PSX', 'VLO', 'MPC', 'OXY', 'HAL'],
-            'Industrials': ['BA', 'CAT', 'GE', 'HON', 'UNP', 'LMT', 'MMM', 'FDX', 'UPS', 'RTX'],
-            'Basic Materials': ['LIN', 'APD', 'ECL', 'DD', 'DOW', 'FCX', 'NEM', 'VMC', 'MLM', 'PPG'],
-            'Real Estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'PSA', 'SPG', 'O', 'WELL', 'DLR', 'EXR'],
-            'Utilities': ['NEE', 'DUK', 'SO', 'AEP', 'EXC', 'XEL', 'SRE', 'D', 'PEG', 'PCG'],
-            'Consumer Defensive': ['PG', 'KO', 'PEP', 'WMT', 'COST', 'CL', 'KMB', 'GIS', 'K', 'CPB']
-        }
-        
-        # Indian stock sector mapping
-        self.indian_sectors = {
-            'Technology': ['TCS.NS', 'INFY.NS', 'WIPRO.NS', 'HCLTECH.NS', 'TECHM.NS', 'LTI.NS', 'MINDTREE.NS'],
-            'Financial Services': ['HDFCBANK.NS', 'ICICIBANK.NS', 'SBIN.NS', 'AXISBANK.NS', 'KOTAKBANK.NS', 'INDUSINDBK.NS'],
-            'Energy': ['RELIANCE.NS', 'ONGC.NS', 'IOC.NS', 'BPCL.NS', 'HINDPETRO.NS', 'GAIL.NS'],
-            'Consumer Cyclical': ['MARUTI.NS', 'BAJAJ-AUTO.NS', 'M&M.NS', 'EICHERMOT.NS', 'HEROMOTOCO.NS'],
-            'Healthcare': ['SUNPHARMA.NS', 'DRREDDY.NS', 'CIPLA.NS', 'LUPIN.NS', 'BIOCON.NS', 'CADILAHC.NS'],
-            'Industrials': ['LT.NS', 'ULTRACEMCO.NS', 'ADANIENT.NS', 'ADANIPORTS.NS', 'TATASTEEL.NS'],
-            'Consumer Defensive': ['HINDUUNILV.NS', 'ITC.NS', 'NESTLEIND.NS', 'GODREJCP.NS', 'DABUR.NS']
-        }
+        self.sector_mapping = US_SECTOR_MAPPING
+        self.indian_sectors = INDIAN_SECTOR_MAPPING
+        self._sector_peers = _SECTOR_PEERS
     
-    def get_stock_price_data(self, ticker: str, period: str = "1y") -> Optional[pd.DataFrame]:
-        """Fetch historical price data for a stock."""
+    @cached_price_data
+    def get_close_prices(self, ticker: str, period: str = "1y") -> Optional[pd.Series]:
+        """Fetch daily closing prices for a stock as a float32 series indexed by trading date."""
+        try:
+            close = _fetch_close_direct(ticker, period)
+            if close is not None:
+                return close
+        except Exception as e:
+            print(f"Chart API failed for {ticker}, falling back to yfinance: {e}")
+        
         try:
             stock = yf.Ticker(ticker)
-            data = stock.history(period=period)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                data = stock.history(period=period, actions=False)
             if data.empty:
                 return None
-            return data
+            
+            # Only the Close column is kept; dates are made tz-naive so series from
+            # different exchanges align on the calendar day
+            close = data['Close'].astype(np.float32)
+            if close.index.tz is not None:
+                close.index = close.index.tz_localize(None)
+            close.index = close.index.normalize()
+            close.name = ticker
+            return close
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
             return None
     
-    def calculate_correlation(self, ticker1: str, ticker2: str, period: str = "1y") -> Dict:
-        """Calculate correlation between two stocks."""
-        try:
-            # Fetch data for both stocks
-            data1 = self.get_stock_price_data(ticker1, period)
-            data2 = self.get_stock_price_data(ticker2, period)
-            
-            if data1 is None or data2 is None:
-                return {"correlation": 0.0, "strength": "No Data", "p_value": 1.0}
-            
-            # Align dates and calculate returns
-            combined_data = pd.DataFrame({
-                'stock1': data1['Close'],
-                'stock2': data2['Close']
-            }).dropna()
-            
-            if len(combined_data) < 30:  # Need enough data points
-                return {"correlation": 0.0, "strength": "Insufficient Data", "p_value": 1.0}
-            
-            # Calculate daily returns
-            returns1 = combined_data['stock1'].pct_change().dropna()
-            returns2 = combined_data['stock2'].pct_change().dropna()
-            
-            # Calculate correlation
-            correlation = returns1.corr(returns2)
-            
-            # Interpret correlation strength
-            abs_corr = abs(correlation)
-            if abs_corr >= 0.8:
-                strength = "Very Strong"
-            elif abs_corr >= 0.6:
-                strength = "Strong"
-            elif abs_corr >= 0.4:
-                strength = "Moderate"
-            elif abs_corr >= 0.2:
-                strength = "Weak"
+    def prefetch_price_data(self, ticker: str, period: str = "1y") -> None:
+        """Start fetching closing prices in the background for a later get_close_prices call."""
+        if load_cached_prices(ticker, period) is not None:
+            return
+        
+        key = (ticker, period)
+        with _price_memo_lock:
+            if key in _pending_prefetches:
+                return
+            fetch = type(self).get_close_prices.__wrapped__
+            future = _PREFETCH_POOL.submit(_fetch_and_cache, fetch, self, ticker, period)
+            _pending_prefetches[key] = future
+        future.add_done_callback(lambda _: _forget_prefetch(key))
+    
+    def get_close_price_frame(self, tickers: List[str], period: str = "1y", refresh: bool = False) -> Optional[pd.DataFrame]:
+        """Fetch closing prices for several stocks concurrently; refresh=True skips today's cache and overwrites it."""
+        closes = {}
+        missing = []
+        for ticker in tickers:
+            data = None if refresh else load_cached_prices(ticker, period)
+            if data is None:
+                missing.append(ticker)
             else:
-                strength = "Very Weak"
-            
-            return {
-                "correlation": round(correlation, 3),
-                "strength": strength,
-                "direction": "Positive" if correlation > 0 else "Negative",
-                "data_points": len(returns1)
-            }
-            
-        except Exception as e:
-            print(f"Error calculating correlation between {ticker1} and {ticker2}: {e}")
-            return {"correlation": 0.0, "strength": "Error", "p_value": 1.0}
+                closes[ticker] = data
+        
+        # Only the network fetches run on the shared I/O pool; results are collected
+        # as they complete and the correlation math stays on the calling thread
+        if refresh:
+            fetch = functools.partial(_fetch_and_cache, type(self).get_close_prices.__wrapped__, self)
+        else:
+            fetch = self.get_close_prices
+        future_map = {
+            _IO_POOL.submit(fetch, ticker, period): ticker
+            for ticker in missing
+        }
+        try:
+            for future in as_completed(future_map, timeout=PRICE_FETCH_TIMEOUT):
+                ticker = future_map[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    print(f"Error fetching data for {ticker}: {e}")
+                    continue
+                if data is not None:
+                    closes[ticker] = data
+        except FuturesTimeoutError:
+            # Don't wait on stragglers; fetches already running still land in the price cache
+            pending = [ticker for future, ticker in future_map.items() if not future.done()]
+            for future in future_map:
+                future.cancel()
+            print(f"Timed out fetching data for {', '.join(pending)}")
+        
+        if not closes:
+            return None
+        return pd.DataFrame({ticker: closes[ticker] for ticker in tickers if ticker in closes})
+    
+    def describe_correlation(self, correlation: float, data_points: int) -> Dict:
+        """Interpret a correlation coefficient as strength and direction."""
+        abs_corr = abs(correlation)
+        if abs_corr >= 0.8:
+            strength = "Very Strong"
+        elif abs_corr >= 0.6:
+            strength = "Strong"
+        elif abs_corr >= 0.4:
+            strength = "Moderate"
+        elif abs_corr >= 0.2:
+            strength = "Weak"
+        else:
+            strength = "Very Weak"
+        
+        return {
+            "correlation": round(float(correlation), 3),
+            "strength": strength,
+            "direction": "Positive" if correlation > 0 else "Negative",
+            "data_points": data_points
+        }
     
     def find_sector_peers(self, ticker: str, sector: str) -> List[str]:
         """Find sector peer stocks."""
-        peers = []
-        
-        # Check if it's an Indian stock
-        if ticker.endswith('.NS') or ticker.endswith('.BO'):
-            sector_stocks = self.indian_sectors.get(sector, [])
-        else:
-            sector_stocks = self.sector_mapping.get(sector, [])
+        # Indian stocks are matched against the Indian sector mapping
+        is_indian = ticker.endswith(('.NS', '.BO'))
+        sector_stocks = self._sector_peers.get((is_indian, sector), ())
         
         # Remove the original ticker from peers
         peers = [stock for stock in sector_stocks if stock != ticker]
         return peers[:8]  # Limit to top 8 peers
     
-    def get_related_stocks(self, ticker: str, sector: str, industry: str) -> Dict[str, List[str]]:
-        """Get related stocks categorized by relationship type."""
-        relationships = {
-            "sector_peers": [],
-            "industry_peers": [],
-            "competitors": []
-        }
+    def get_related_stocks(self, ticker: str, sector: str, industry: str) -> Dict[str, Set[str]]:
+        """Get related stocks, each mapped to the set of relationship types it falls under."""
+        relationships: Dict[str, Set[str]] = {}
+        
+        def add(stocks: List[str], category: str) -> None:
+            for stock in stocks:
+                relationships.setdefault(stock, set()).add(category)
         
         # Get sector peers
         sector_peers = self.find_sector_peers(ticker, sector)
-        relationships["sector_peers"] = sector_peers[:5]
+        add(sector_peers[:5], "sector_peers")
         
         # For industry peers, we'll use a subset of sector peers
         # In a real implementation, you might want to use industry-specific data
-        relationships["industry_peers"] = sector_peers[2:6] if len(sector_peers) > 2 else sector_peers
+        add(sector_peers[2:6] if len(sector_peers) > 2 else sector_peers, "industry_peers")
         
         # Competitors can be the same as sector peers for simplicity
-        relationships["competitors"] = sector_peers[:4]
+        add(sector_peers[:4], "competitors")
         
         return relationships
     
-    def analyze_stock_impact(self, primary_ticker: str, sector: str) -> Dict:
-        """Comprehensive impact analysis for a stock."""
+    def analyze_stock_impact(self, primary_ticker: str, sector: str, refresh: bool = False) -> Dict:
+        """Comprehensive impact analysis for a stock; refresh=True downloads fresh prices."""
         try:
             # Get related stocks
             related_stocks = self.get_related_stocks(primary_ticker, sector, "")
             
             # Calculate correlations with each related stock
             correlation_results = []
+            abs_correlations = np.empty(0)
             
-            # Process all related stocks
-            all_related = []
-            for category, stocks in related_stocks.items():
-                for stock in stocks:
-                    if stock not in all_related:
-                        all_related.append((stock, category))
+            # Fetch the primary and all related stocks up front
+            tickers = [primary_ticker] + list(related_stocks)
+            closes = self.get_close_price_frame(tickers, refresh=refresh)
             
-            # Calculate correlations concurrently for faster processing
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = []
-                for stock, category in all_related:
-                    future = executor.submit(self.calculate_correlation, primary_ticker, stock)
-                    futures.append((future, stock, category))
+            if closes is not None and primary_ticker in closes:
+                # Keep stocks with enough history, then align on the dates they all traded
+                closes = closes.dropna(axis=1, thresh=30).dropna()
+                related = [(stock, categories) for stock, categories in related_stocks.items() if stock in closes]
                 
-                for future, stock, category in futures:
-                    try:
-                        correlation_data = future.result(timeout=10)
-                        if correlation_data["correlation"] != 0.0:
-                            correlation_results.append({
-                                "ticker": stock,
-                                "relationship_type": category,
-                                "correlation": correlation_data["correlation"],
-                                "strength": correlation_data["strength"],
-                                "direction": correlation_data.get("direction", "Neutral"),
-                                "impact_score": abs(correlation_data["correlation"]) * 100
-                            })
-                    except Exception as e:
-                        print(f"Error processing {stock}: {e}")
-                        continue
-            
-            # Sort by correlation strength
-            correlation_results.sort(key=lambda x: abs(x["correlation"]), reverse=True)
+                if primary_ticker in closes and related and len(closes) >= 30:
+                    # Correlate daily log returns of every stock in one matrix operation
+                    prices = closes[[primary_ticker] + [stock for stock, _ in related]].to_numpy(dtype=np.float64)
+                    # Non-finite returns are masked out and flat series yield NaN below
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        log_prices = np.log(prices)
+                        returns = log_prices[1:] - log_prices[:-1]
+                        returns = returns[np.isfinite(returns).all(axis=1)]
+                        correlations = np.round(np.corrcoef(returns, rowvar=False)[0, 1:], 3)
+                    
+                    # Drop undefined/zero correlations and sort by strength, strongest first
+                    keep = np.flatnonzero(np.isfinite(correlations) & (correlations != 0.0))
+                    order = keep[np.argsort(-np.abs(correlations[keep]), kind='stable')]
+                    abs_correlations = np.abs(correlations[order])
+                    
+                    for i in order:
+                        stock, categories = related[i]
+                        relationship_types = [category for category in RELATIONSHIP_TYPES if category in categories]
+                        correlation_data = self.describe_correlation(correlations[i], len(returns))
+                        correlation_results.append({
+                            "ticker": stock,
+                            "relationship_type": relationship_types[0],
+                            "relationship_types": relationship_types,
+                            "correlation": correlation_data["correlation"],
+                            "strength": correlation_data["strength"],
+                            "direction": correlation_data["direction"],
+                            "impact_score": abs(correlation_data["correlation"]) * 100
+                        })
             
             # Calculate overall impact metrics
             if correlation_results:
-                avg_correlation = np.mean([abs(r["correlation"]) for r in correlation_results])
-                max_correlation = max([abs(r["correlation"]) for r in correlation_results])
+                avg_correlation = float(abs_correlations.mean())
+                max_correlation = float(abs_correlations.max())
                 
                 # Determine overall market influence
                 if avg_correlation >= 0.6:
@@ -224,41 +410,6 @@ class StockCorrelationEngine:
                 "error": str(e)
             }
     
-    def get_impact_network_data(self, correlation_results: List[Dict]) -> Dict:
-        """Generate network visualization data for impact analysis."""
-        nodes = []
-        edges = []
-        
-        # Add primary node (will be set by caller)
-        
-        # Add related stock nodes
-        for result in correlation_results:
-            # Color based on correlation strength
-            if abs(result["correlation"]) >= 0.6:
-                color = "#e74c3c"  # Red for strong correlation
-            elif abs(result["correlation"]) >= 0.4:
-                color = "#f39c12"  # Orange for moderate
-            else:
-                color = "#3498db"  # Blue for weak
-            
-            nodes.append({
-                "id": result["ticker"],
-                "label": result["ticker"],
-                "color": color,
-                "size": abs(result["correlation"]) * 50 + 10,
-                "relationship": result["relationship_type"]
-            })
-            
-            edges.append({
-                "from": "primary",  # Will be replaced with actual primary ticker
-                "to": result["ticker"],
-                "width": abs(result["correlation"]) * 5,
-                "color": color,
-                "correlation": result["correlation"]
-            })
-        
-        return {"nodes": nodes, "edges": edges}
-
 # Test function
 if __name__ == "__main__":
     engine = StockCorrelationEngine()
@@ -6,16 +6,57 @@ including sector information, related stocks, and impact analysis.
 """
 
 import yfinance as yf
-import requests
 import json
+import threading
+from cachetools import TTLCache
+from types import MappingProxyType
 from typing import Dict, Optional, List
 from correlation_engine import StockCorrelationEngine
+from stock_info import infer_sector_from_industry
+from ticker_store import clear_ticker_store, get_stored_ticker, store_ticker
+from http_session import YAHOO_SESSION
+
+# One engine per process so its precomputed peer groups are built once
+_CORRELATION_ENGINE = StockCorrelationEngine()
+
+# Company profiles change slowly, so Yahoo's .info payloads are kept for an hour
+_INFO_CACHE = TTLCache(maxsize=512, ttl=3600)
+
+# Yahoo search results by normalized company name; misses are not cached
+_TICKER_CACHE = TTLCache(maxsize=2048, ttl=3600)
+
+# Guards both caches above
+_CACHE_LOCK = threading.Lock()
 
 def get_ticker_symbol(company_name: str) -> str:
     """
     Try to find a ticker symbol given a company name.
-    Uses Yahoo Finance search API.
+    Checks the local mapping first and only falls back to the Yahoo Finance
+    search API for unknown names.
     """
+    # Well-known companies resolve locally without a network round-trip
+    mapped = get_ticker_from_mapping(company_name)
+    if mapped:
+        return mapped
+    
+    key = company_name.strip().lower()
+    with _CACHE_LOCK:
+        cached = _TICKER_CACHE.get(key)
+    if cached is not None:
+        return cached
+    
+    # Resolutions persisted by an earlier process skip the Yahoo search
+    ticker_symbol = get_stored_ticker(key)
+    if not ticker_symbol:
+        ticker_symbol = _search_ticker_symbol(company_name)
+        if ticker_symbol:
+            store_ticker(key, ticker_symbol)
+    if ticker_symbol:
+        with _CACHE_LOCK:
+            _TICKER_CACHE[key] = ticker_symbol
+    return ticker_symbol
+
+def _search_ticker_symbol(company_name: str) -> str:
     try:
         # Clean company name
         clean_name = company_name.strip().replace(" ", "%20")
@@ -23,11 +64,7 @@ def get_ticker_symbol(company_name: str) -> str:
         # Yahoo Finance search endpoint
         url = f"https://query2.finance.yahoo.com/v1/finance/search?q={clean_name}&quotesCount=5&enableFuzzyQuery=false"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=5)
+        response = YAHOO_SESSION.get(url, timeout=5)
         if response.status_code == 200:
             data = response.json()
             quotes = data.get('quotes', [])
@@ -50,46 +87,112 @@ def get_ticker_symbol(company_name: str) -> str:
     except Exception as e:
         print(f"Error searching for ticker: {e}")
     
-    # Fallback: try common company-to-ticker mapping
-    return get_ticker_from_mapping(company_name)
+    return ''
+
+def clear_stock_caches() -> None:
+    """Drop all cached ticker symbols (persisted ones included) and Yahoo profile data."""
+    with _CACHE_LOCK:
+        _TICKER_CACHE.clear()
+        _INFO_CACHE.clear()
+    clear_ticker_store()
+
+# Common mappings for well-known companies, read-only and built once
+_TICKER_MAPPING = MappingProxyType({
+    'apple': 'AAPL',
+    'microsoft': 'MSFT',
+    'google': 'GOOGL',
+    'alphabet': 'GOOGL',
+    'amazon': 'AMZN',
+    'tesla': 'TSLA',
+    'meta': 'META',
+    'facebook': 'META',
+    'netflix': 'NFLX',
+    'nvidia': 'NVDA',
+    'tcs': 'TCS.NS',
+    'infosys': 'INFY.NS',
+    'reliance': 'RELIANCE.NS',
+    'hdfc bank': 'HDFCBANK.NS',
+    'hdfc': 'HDFCBANK.NS',
+    'icici bank': 'ICICIBANK.NS',
+    'icici': 'ICICIBANK.NS',
+    'wipro': 'WIPRO.NS',
+    'bharti airtel': 'BHARTIARTL.NS',
+    'airtel': 'BHARTIARTL.NS',
+    'maruti suzuki': 'MARUTI.NS',
+    'maruti': 'MARUTI.NS',
+    'amd': 'AMD',
+    'intel': 'INTC',
+    'oracle': 'ORCL',
+    'salesforce': 'CRM',
+    'adobe': 'ADBE',
+    'ibm': 'IBM',
+    'jpmorgan': 'JPM',
+    'jp morgan': 'JPM',
+    'goldman sachs': 'GS',
+    'bank of america': 'BAC',
+    'visa': 'V',
+    'mastercard': 'MA',
+    'walmart': 'WMT',
+    'coca-cola': 'KO',
+    'coca cola': 'KO',
+    'pepsico': 'PEP',
+    'disney': 'DIS',
+    'nike': 'NKE',
+    'boeing': 'BA',
+    'exxon mobil': 'XOM',
+    'exxonmobil': 'XOM',
+    'pfizer': 'PFE',
+    'johnson & johnson': 'JNJ',
+    'hcl technologies': 'HCLTECH.NS',
+    'tech mahindra': 'TECHM.NS',
+    'state bank of india': 'SBIN.NS',
+    'sbi': 'SBIN.NS',
+    'axis bank': 'AXISBANK.NS',
+    'kotak mahindra bank': 'KOTAKBANK.NS',
+    'itc': 'ITC.NS',
+    'larsen & toubro': 'LT.NS',
+    'tata motors': 'TATAMOTORS.NS',
+    'tata steel': 'TATASTEEL.NS',
+    'sun pharma': 'SUNPHARMA.NS',
+    'asian paints': 'ASIANPAINT.NS',
+    'bajaj finance': 'BAJFINANCE.NS',
+    'adani enterprises': 'ADANIENT.NS'
+})
 
 def get_ticker_from_mapping(company_name: str) -> str:
     """
-    Fallback method using common company name to ticker mapping
+    Local lookup using common company name to ticker mapping
     """
-    # Common mappings for well-known companies
-    mapping = {
-        'apple': 'AAPL',
-        'microsoft': 'MSFT',
-        'google': 'GOOGL',
-        'alphabet': 'GOOGL',
-        'amazon': 'AMZN',
-        'tesla': 'TSLA',
-        'meta': 'META',
-        'facebook': 'META',
-        'netflix': 'NFLX',
-        'nvidia': 'NVDA',
-        'tcs': 'TCS.NS',
-        'infosys': 'INFY.NS',
-        'reliance': 'RELIANCE.NS',
-        'hdfc bank': 'HDFCBANK.NS',
-        'hdfc': 'HDFCBANK.NS',
-        'icici bank': 'ICICIBANK.NS',
-        'icici': 'ICICIBANK.NS',
-        'wipro': 'WIPRO.NS',
-        'bharti airtel': 'BHARTIARTL.NS',
-        'airtel': 'BHARTIARTL.NS',
-        'maruti suzuki': 'MARUTI.NS',
-        'maruti': 'MARUTI.NS'
-    }
+    return _TICKER_MAPPING.get(company_name.lower().strip(), '')
+
+def _get_ticker_info(ticker_symbol: str, refresh: bool = False) -> Dict:
+    """
+    Fetch the Yahoo Finance info dict for a ticker, served from a TTL cache
+    when available unless refresh is set. Empty responses are not cached.
+    """
+    with _CACHE_LOCK:
+        info = None if refresh else _INFO_CACHE.get(ticker_symbol)
+    
+    if info is None:
+        info = dict(yf.Ticker(ticker_symbol, session=YAHOO_SESSION).info or {})
+        if info:
+            with _CACHE_LOCK:
+                _INFO_CACHE[ticker_symbol] = info
     
-    name_lower = company_name.lower().strip()
-    return mapping.get(name_lower, '')
+    return info
 
-def get_comprehensive_stock_info(company_name: str) -> Dict:
+def _truncate_summary(summary: str, limit: int = 500) -> str:
+    """Cut a long business summary at the last word break before the limit, keeping its line breaks."""
+    if len(summary) <= limit:
+        return summary
+    return summary[:limit].rsplit(' ', 1)[0] + '...'
+
+def get_comprehensive_stock_info(company_name: str, include_summary: bool = True, refresh: bool = False) -> Dict:
     """
     Get comprehensive stock information including sector, industry, and correlation analysis.
     Returns a dictionary with all stock details including related stocks impact analysis.
+    Pass include_summary=False to leave business_summary empty when it isn't displayed,
+    and refresh=True to bypass the cached profile and today's cached prices.
     """
     if not company_name or not company_name.strip():
         return {
@@ -123,12 +226,14 @@ def get_comprehensive_stock_info(company_name: str) -> Dict:
             "error": "Could not find ticker symbol"
         }
     
+    # Start loading price history while the profile is fetched; the
+    # correlation analysis below picks it up from the engine's cache
+    if not refresh:
+        _CORRELATION_ENGINE.prefetch_price_data(ticker_symbol)
+    
     try:
-        # Create yfinance ticker object
-        stock = yf.Ticker(ticker_symbol)
-        
         # Get stock info
-        info = stock.info
+        info = _get_ticker_info(ticker_symbol, refresh=refresh)
         
         if not info:
             # If info is empty, return basic structure
@@ -152,7 +257,7 @@ def get_comprehensive_stock_info(company_name: str) -> Dict:
         market_cap = info.get('marketCap', 0)
         country = info.get('country', 'Unknown')
         website = info.get('website', '')
-        business_summary = info.get('longBusinessSummary', '')
+        business_summary = (info.get('longBusinessSummary') or '') if include_summary else ''
         employee_count = info.get('fullTimeEmployees', 0)
         
         # If sector is still unknown, try to infer from industry
@@ -166,8 +271,7 @@ def get_comprehensive_stock_info(company_name: str) -> Dict:
         # Perform correlation analysis if we have a valid sector
         if sector != 'Unknown':
             try:
-                correlation_engine = StockCorrelationEngine()
-                impact_analysis = correlation_engine.analyze_stock_impact(ticker_symbol, sector)
+                impact_analysis = _CORRELATION_ENGINE.analyze_stock_impact(ticker_symbol, sector, refresh=refresh)
                 
                 correlation_analysis = {
                     "total_analyzed": impact_analysis['summary']['total_analyzed'],
@@ -195,7 +299,7 @@ def get_comprehensive_stock_info(company_name: str) -> Dict:
             "market_cap": market_cap,
             "country": country,
             "website": website,
-            "business_summary": business_summary[:500] + '...' if len(business_summary) > 500 else business_summary,
+            "business_summary": _truncate_summary(business_summary),
             "employee_count": employee_count,
             "correlation_analysis": correlation_analysis,
             "related_stocks": related_stocks
@@ -217,51 +321,6 @@ def get_comprehensive_stock_info(company_name: str) -> Dict:
             "error": str(e)
         }
 
-def infer_sector_from_industry(industry: str) -> str:
-    """
-    Infer sector from industry when sector information is not available
-    """
-    industry_lower = industry.lower()
-    
-    # Technology sectors
-    if any(keyword in industry_lower for keyword in ['software', 'technology', 'internet', 'computer', 'semiconductor', 'electronics']):
-        return 'Technology'
-    
-    # Financial sectors
-    elif any(keyword in industry_lower for keyword in ['bank', 'financial', 'insurance', 'credit', 'investment']):
-        return 'Financial Services'
-    
-    # Healthcare sectors
-    elif any(keyword in industry_lower for keyword in ['pharmaceutical', 'biotechnology', 'medical', 'healthcare', 'drug']):
-        return 'Healthcare'
-    
-    # Energy sectors
-    elif any(keyword in industry_lower for keyword in ['oil', 'gas', 'energy', 'petroleum', 'renewable']):
-        return 'Energy'
-    
-    # Consumer sectors
-    elif any(keyword in industry_lower for keyword in ['retail', 'consumer', 'food', 'beverage', 'restaurant']):
-        return 'Consumer Cyclical'
-    
-    # Industrial sectors
-    elif any(keyword in industry_lower for keyword in ['manufacturing', 'industrial', 'aerospace', 'defense', 'transportation']):
-        return 'Industrials'
-    
-    # Real Estate
-    elif any(keyword in industry_lower for keyword in ['real estate', 'property', 'reit']):
-        return 'Real Estate'
-    
-    # Utilities
-    elif any(keyword in industry_lower for keyword in ['utility', 'utilities', 'electric', 'water', 'power']):
-        return 'Utilities'
-    
-    # Materials
-    elif any(keyword in industry_lower for keyword in ['mining', 'materials', 'chemicals', 'steel', 'aluminum']):
-        return 'Basic Materials'
-    
-    else:
-        return 'Unknown'
-
 def format_market_cap(market_cap: int) -> str:
     """
     Format market cap into readable format (B for billions, M for millions)
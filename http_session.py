@@ -0,0 +1,24 @@
+"""
+HTTP Session Helpers
+
+Builds the pooled keep-alive requests sessions shared by the app's API clients.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Yahoo rejects requests without a browser-like User-Agent
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+def make_session(pool_maxsize: int = 20, retries=0, browser: bool = True) -> requests.Session:
+    """Create a keep-alive session with a pooled HTTPS adapter."""
+    session = requests.Session()
+    if browser:
+        session.headers['User-Agent'] = BROWSER_USER_AGENT
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, max_retries=retries))
+    return session
+
+# One session for every Yahoo Finance call (search, quoteSummary, chart and
+# yfinance), sized for the 16-thread price fan-out plus request threads
+YAHOO_SESSION = make_session(pool_maxsize=32, retries=Retry(total=2, backoff_factor=0.2))
@@ -1,27 +1,34 @@
 # Updated app.py with Analysis History Storage
 
+import hashlib
 import os
+import secrets
 import os as _os
 _os.environ["HF_HUB_DISABLE_IMPLICIT_TOKEN"] = "1"
 
+import threading
 import time
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
-import requests
-import pandas as pd
-from flask import Flask, render_template, request, session, redirect, url_for, flash, jsonify
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util
+from urllib3.util.retry import Retry
+from cachetools import LRUCache, TTLCache
+from flask import Flask, render_template, request, session, redirect, url_for, flash, jsonify, make_response
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from sentence_transformers import SentenceTransformer
 from werkzeug.security import generate_password_hash, check_password_hash
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, InterfaceError, OperationalError, PoolError, errorcode, pooling
 import re
-from functools import wraps
-import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+import orjson
 
 # Import our enhanced modules
 from enhanced_stock_info import get_comprehensive_stock_info, format_market_cap, format_employee_count
 from correlation_engine import StockCorrelationEngine
+from http_session import make_session
 
 # Load API key
 load_dotenv()
@@ -45,11 +52,36 @@ MYSQL_CONFIG = {
     'autocommit': True
 }
 
+# Connections are pooled per process; size it to the server's request threads
+# and keep pool size x worker processes under MySQL's max_connections
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 16))
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
 def get_db_connection():
-    """Create and return a MySQL database connection."""
+    """Check out a MySQL connection from the shared pool; closing it returns it to the pool."""
+    global _db_pool
     try:
-        connection = mysql.connector.connect(**MYSQL_CONFIG)
-        return connection
+        if _db_pool is None:
+            with _db_pool_lock:
+                if _db_pool is None:
+                    # No session state is set (autocommit is on), so skip the reset on
+                    # check-in; it would also drop each connection's prepared statements
+                    _db_pool = pooling.MySQLConnectionPool(
+                        pool_name="stock_sentiment",
+                        pool_size=MYSQL_POOL_SIZE,
+                        pool_reset_session=False,
+                        **MYSQL_CONFIG
+                    )
+        return _db_pool.get_connection()
+    except PoolError as e:
+        # Pool exhausted under load: fall back to a one-off connection
+        print(f"MySQL pool unavailable, connecting directly: {e}")
+        try:
+            return mysql.connector.connect(**MYSQL_CONFIG)
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            return None
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
@@ -112,11 +144,81 @@ def init_db():
                 correlation_summary JSON,
                 news_data JSON,
                 stock_info JSON,
+                analysis_token CHAR(16),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL,
                 INDEX idx_user_id (user_id),
                 INDEX idx_session_id (session_id),
-                INDEX idx_created_at (created_at)
+                INDEX idx_created_at (created_at),
+                INDEX idx_user_created (user_id, created_at),
+                INDEX idx_user_token (user_id, analysis_token)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        ''')
+        
+        # Tables created before analysis_token existed get the column and its index here
+        try:
+            cursor.execute('''
+                ALTER TABLE analysis_history
+                ADD COLUMN analysis_token CHAR(16),
+                ADD INDEX idx_user_token (user_id, analysis_token)
+            ''')
+        except Error as e:
+            if e.errno != errorcode.ER_DUP_FIELDNAME:  # column already present
+                raise
+        
+        # Tables created before idx_user_created existed get it added here
+        try:
+            cursor.execute('ALTER TABLE analysis_history ADD INDEX idx_user_created (user_id, created_at)')
+        except Error as e:
+            if e.errno != errorcode.ER_DUP_KEYNAME:  # index already present
+                raise
+        
+        # One row per analysed article so sentiment can be aggregated in SQL;
+        # analysis_history.news_data keeps the full article JSON for display
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_articles (
+                analysis_id INT NOT NULL,
+                idx INT NOT NULL,
+                title VARCHAR(512) NOT NULL,
+                sentiment ENUM('Positive', 'Negative', 'Neutral') NOT NULL,
+                source VARCHAR(255),
+                published_at DATETIME,
+                PRIMARY KEY (analysis_id, idx),
+                FOREIGN KEY (analysis_id) REFERENCES analysis_history (id) ON DELETE CASCADE,
+                INDEX idx_sentiment (sentiment),
+                INDEX idx_published_at (published_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        ''')
+        
+        # Tables from before published_at kept only the article's date
+        try:
+            cursor.execute('''
+                ALTER TABLE analysis_articles
+                CHANGE published_date published_at DATETIME,
+                RENAME INDEX idx_published_date TO idx_published_at
+            ''')
+        except Error as e:
+            if e.errno != errorcode.ER_BAD_FIELD_ERROR:  # already migrated
+                raise
+        
+        # One row per analysis with the stock's profile and correlation headline
+        # figures, for sector and influence rollups without decoding stock_info
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_stock_info (
+                analysis_id INT PRIMARY KEY,
+                ticker_symbol VARCHAR(20),
+                sector VARCHAR(100),
+                industry VARCHAR(100),
+                market_cap BIGINT DEFAULT 0,
+                country VARCHAR(100),
+                employee_count INT DEFAULT 0,
+                website VARCHAR(255),
+                average_correlation DOUBLE,
+                market_influence VARCHAR(20),
+                FOREIGN KEY (analysis_id) REFERENCES analysis_history (id) ON DELETE CASCADE,
+                INDEX idx_sector (sector),
+                INDEX idx_industry (industry),
+                INDEX idx_market_influence (market_influence)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         ''')
         
@@ -137,21 +239,180 @@ except Exception as e:
     print(f"Failed to initialize database: {e}")
 
 # Models (lazy-loaded on first request)
-sentiment_analyzer = None
+SENTIMENT_MODEL = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+SENTIMENT_BATCH_SIZE = 32
+# Headlines are short; longer inputs are truncated
+SENTIMENT_MAX_LENGTH = 128
+SENTIMENT_DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# int8 dynamic quantization of Linear layers for CPU inference (QUANTIZE_MODELS=0 disables)
+QUANTIZE_MODELS = os.getenv("QUANTIZE_MODELS", "1") == "1" and not torch.cuda.is_available()
+
+def _bf16_supported():
+    """Whether this machine has native bfloat16 matmuls (Ampere+ GPU, or a CPU with AVX512_BF16 or AMX).
+
+    Plain AVX-512 CPUs (e.g. Skylake-SP, Cascade Lake) only emulate bf16 and run it
+    slower than fp32, so they keep the fp32/int8 path.
+    """
+    if torch.cuda.is_available():
+        return torch.cuda.is_bf16_supported()
+    try:
+        # torch >= 2.2 reports the instruction sets themselves
+        return torch._C._cpu._is_avx512_bf16_supported() or torch._C._cpu._is_amx_tile_supported()
+    except AttributeError:
+        # Older torch (oneDNN's own bf16 check also passes on emulating CPUs): read the flags (Linux only)
+        try:
+            with open("/proc/cpuinfo") as cpuinfo:
+                flags = next((line for line in cpuinfo if line.startswith("flags")), "").split()
+        except OSError:
+            return False
+        return "avx512_bf16" in flags or "amx_bf16" in flags
+
+# bfloat16 weights for the unquantized sentiment model (SENTIMENT_BF16=0 disables)
+SENTIMENT_BF16 = (os.getenv("SENTIMENT_BF16", "1") == "1" and not QUANTIZE_MODELS
+                  and _bf16_supported())
+# torch.compile the unquantized sentiment model at load time (TORCH_COMPILE=1 enables)
+TORCH_COMPILE = os.getenv("TORCH_COMPILE", "0") == "1"
+
+# Leave cores for Flask's request threads instead of letting torch claim them all;
+# under gunicorn, size this per worker (e.g. cores / workers)
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", max(1, (os.cpu_count() or 2) // 2)))
+torch.set_num_threads(TORCH_NUM_THREADS)
+try:
+    # Only allowed before torch starts any inter-op work
+    torch.set_num_interop_threads(1)
+except RuntimeError as e:
+    print(f"Could not set torch inter-op threads: {e}")
+
+sentiment_tokenizer = None
+sentiment_model = None
 sbert_model = None
 correlation_engine = None
 
+# Per-title model outputs, reused when analyses see the same headlines
+ARTICLE_CACHE_TTL = 24 * 3600
+_title_embedding_cache = TTLCache(maxsize=10000, ttl=ARTICLE_CACHE_TTL)
+_title_sentiment_cache = TTLCache(maxsize=10000, ttl=ARTICLE_CACHE_TTL)
+_article_cache_lock = threading.Lock()
+
+# HF fast tokenizers aren't safe to call from several threads at once, so model
+# calls are serialized; concurrent analyses still overlap their network I/O
+_inference_lock = threading.Lock()
+
+def _title_key(title):
+    return hashlib.sha1(title.encode('utf-8')).hexdigest()
+
+def encode_titles(titles):
+    """Return normalized SBERT embeddings for titles, encoding only those not cached."""
+    keys = [_title_key(title) for title in titles]
+    with _article_cache_lock:
+        embeddings = [_title_embedding_cache.get(key) for key in keys]
+    
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        with _inference_lock:
+            encoded = sbert_model.encode(
+                [titles[i] for i in missing],
+                batch_size=64,
+                convert_to_tensor=True,
+                normalize_embeddings=True
+            )
+        with _article_cache_lock:
+            for i, embedding in zip(missing, encoded):
+                # Copy so cached rows don't keep the whole batch tensor alive
+                embeddings[i] = embedding.clone()
+                _title_embedding_cache[keys[i]] = embeddings[i]
+    
+    return torch.stack(embeddings)
+
+@lru_cache(maxsize=1024)
+def _company_embedding(normalized_name):
+    with _inference_lock:
+        return sbert_model.encode(normalized_name, convert_to_tensor=True, normalize_embeddings=True)
+
+def encode_company(company):
+    """Return the normalized SBERT embedding for a company name, cached across analyses."""
+    # MiniLM's tokenizer is uncased, so lower-casing doesn't change the embedding
+    return _company_embedding(company.strip().lower())
+
+def classify_titles(titles):
+    """Return the sentiment label for each title, running the model only on uncached ones."""
+    keys = [_title_key(title) for title in titles]
+    with _article_cache_lock:
+        labels = [_title_sentiment_cache.get(key) for key in keys]
+    
+    missing = [i for i, label in enumerate(labels) if label is None]
+    if missing:
+        predictions = []
+        with _inference_lock, torch.inference_mode():
+            for start in range(0, len(missing), SENTIMENT_BATCH_SIZE):
+                batch = sentiment_tokenizer(
+                    [titles[i] for i in missing[start:start + SENTIMENT_BATCH_SIZE]],
+                    padding=True,
+                    truncation=True,
+                    max_length=SENTIMENT_MAX_LENGTH,
+                    return_tensors="pt"
+                ).to(SENTIMENT_DEVICE)
+                predictions.extend(sentiment_model(**batch).logits.float().argmax(dim=-1).tolist())
+        
+        id2label = sentiment_model.config.id2label
+        with _article_cache_lock:
+            for i, prediction in zip(missing, predictions):
+                labels[i] = id2label[prediction].upper()
+                _title_sentiment_cache[keys[i]] = labels[i]
+    
+    return labels
+
+_models_lock = threading.Lock()
+
 def load_models():
-    global sentiment_analyzer, sbert_model, correlation_engine
-    if sentiment_analyzer is None:
-        sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model="distilbert/distilbert-base-uncased-finetuned-sst-2-english"
-        )
-    if sbert_model is None:
-        sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
-    if correlation_engine is None:
-        correlation_engine = StockCorrelationEngine()
+    global sentiment_tokenizer, sentiment_model, sbert_model, correlation_engine
+    if sentiment_model is not None and sbert_model is not None and correlation_engine is not None:
+        return
+    # Serialize loading so the warm-up thread and early requests don't load twice
+    with _models_lock:
+        if sentiment_model is None:
+            sentiment_tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+            model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL)
+            if QUANTIZE_MODELS:
+                # BetterTransformer's fused layers bypass nn.Linear, so quantization replaces it on CPU
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            else:
+                try:
+                    # Fused attention kernels; needs the optional `optimum` package
+                    model = model.to_bettertransformer()
+                except Exception as e:
+                    print(f"BetterTransformer unavailable, using eager model: {e}")
+            model = model.to(SENTIMENT_DEVICE).eval()
+            if SENTIMENT_BF16:
+                # Only the weights are cast; the tokenizer's integer inputs are unaffected
+                model = model.to(dtype=torch.bfloat16)
+            if TORCH_COMPILE and not QUANTIZE_MODELS:
+                try:
+                    # Padded batch shapes vary, so compile for dynamic shapes
+                    compiled = torch.compile(model, dynamic=True)
+                    # Compilation is lazy: run a batch here so Dynamo/Inductor
+                    # failures surface now instead of inside a user request
+                    warmup = sentiment_tokenizer(
+                        ["warm up", "warm up the compiled model"],
+                        padding=True,
+                        return_tensors="pt"
+                    ).to(SENTIMENT_DEVICE)
+                    with torch.inference_mode():
+                        compiled(**warmup)
+                    model = compiled
+                except Exception as e:
+                    print(f"torch.compile failed, using eager model: {e}")
+            sentiment_model = model
+        if sbert_model is None:
+            sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
+            if QUANTIZE_MODELS:
+                sbert_model = torch.quantization.quantize_dynamic(sbert_model, {torch.nn.Linear}, dtype=torch.qint8)
+        if correlation_engine is None:
+            correlation_engine = StockCorrelationEngine()
+
+# Warm the models in the background so the first request doesn't pay the load time
+if os.getenv("WARM_MODELS_ON_STARTUP", "1") == "1":
+    threading.Thread(target=load_models, name="model-warmup", daemon=True).start()
 
 # Authentication helper functions
 def login_required(f):
@@ -163,24 +424,90 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Validation patterns, compiled once at import
+_UPPERCASE_RE = re.compile(r"[A-Z]")
+_LOWERCASE_RE = re.compile(r"[a-z]")
+_DIGIT_RE = re.compile(r"\d")
+_SPECIAL_CHAR_RE = re.compile(r"[!@#$%^&*(),.?\":{}|<>]")
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_DATE_PARAM_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+@app.before_request
+def reject_malformed_date():
+    """Send requests with a malformed ?date= back to the same page before any handler runs."""
+    date_param = request.args.get("date")
+    if date_param is not None and not _DATE_PARAM_RE.match(date_param):
+        flash("Invalid date, expected YYYY-MM-DD", "error")
+        return redirect(request.path)
+
 def validate_password(password):
     """Validate password strength."""
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r"[A-Z]", password):
+    if not _UPPERCASE_RE.search(password):
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r"[a-z]", password):
+    if not _LOWERCASE_RE.search(password):
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r"\d", password):
+    if not _DIGIT_RE.search(password):
         return False, "Password must contain at least one number"
-    if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
+    if not _SPECIAL_CHAR_RE.search(password):
         return False, "Password must contain at least one special character"
     return True, "Password is valid"
 
 def validate_email(email):
     """Validate email format."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
+
+# Hot per-request lookups, run as server-side prepared statements
+SQL_USER_BY_USERNAME = 'SELECT * FROM users WHERE username = %s'
+SQL_USER_BY_EMAIL = 'SELECT * FROM users WHERE email = %s'
+SQL_USER_WATCHLIST = 'SELECT company_name FROM watchlists WHERE user_id = %s'
+SQL_COUNT_WATCHLIST = 'SELECT COUNT(*) FROM watchlists WHERE user_id = %s'
+SQL_COUNT_ANALYSES = '''
+    SELECT (SELECT COUNT(*) FROM analysis_history WHERE user_id = %s)
+         + (SELECT COUNT(*) FROM analysis_history WHERE user_id IS NULL)
+'''
+SQL_SAVED_STOCK_INFO = '''
+    SELECT id, stock_info FROM analysis_history
+    WHERE user_id = %s AND analysis_token = %s
+    ORDER BY id DESC LIMIT 1
+'''
+
+# Prepared cursors per server connection id. A pooled connection is only used by
+# one thread at a time, so just the outer cache needs the lock; ids of closed or
+# reconnected connections age out of the LRU.
+_prepared_cursors = LRUCache(maxsize=MYSQL_POOL_SIZE * 2)
+_prepared_cursors_lock = threading.Lock()
+
+def _is_stale_statement_error(error):
+    """Whether an error means the connection or its prepared statement is gone."""
+    return (isinstance(error, (OperationalError, InterfaceError))
+            or error.errno == errorcode.ER_UNKNOWN_STMT_HANDLER)
+
+def run_prepared(connection, sql, params):
+    """Run a registered statement and return all its rows.
+
+    Each pooled connection keeps one prepared cursor per statement, so the
+    statement is parsed once per connection instead of on every request.
+    """
+    with _prepared_cursors_lock:
+        cursors = _prepared_cursors.get(connection.connection_id)
+        if cursors is None:
+            cursors = _prepared_cursors[connection.connection_id] = {}
+    
+    for attempt in range(2):
+        cursor = cursors.get(sql)
+        if cursor is None:
+            cursor = cursors[sql] = connection.cursor(prepared=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except Error as e:
+            cursors.pop(sql, None)
+            if attempt or not _is_stale_statement_error(e):
+                raise
+            # The server-side statement was lost; prepare it again once
+            print(f"Re-preparing statement after connection error: {e}")
 
 # Database helper functions
 def get_user_by_username(username):
@@ -189,12 +516,11 @@ def get_user_by_username(username):
     if connection is None:
         return None
     
-    cursor = connection.cursor()
-    cursor.execute('SELECT * FROM users WHERE username = %s', (username,))
-    user = cursor.fetchone()
-    cursor.close()
-    connection.close()
-    return user
+    try:
+        rows = run_prepared(connection, SQL_USER_BY_USERNAME, (username,))
+    finally:
+        connection.close()
+    return rows[0] if rows else None
 
 def get_user_by_email(email):
     """Get user by email."""
@@ -202,11 +528,28 @@ def get_user_by_email(email):
     if connection is None:
         return None
     
-    cursor = connection.cursor()
-    cursor.execute('SELECT * FROM users WHERE email = %s', (email,))
-    user = cursor.fetchone()
-    cursor.close()
-    connection.close()
+    try:
+        rows = run_prepared(connection, SQL_USER_BY_EMAIL, (email,))
+    finally:
+        connection.close()
+    return rows[0] if rows else None
+
+def get_user_by_id(user_id):
+    """Get a user's profile fields by id (without the password hash)."""
+    connection = get_db_connection()
+    if connection is None:
+        return None
+    
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            'SELECT id, username, email, full_name, created_at FROM users WHERE id = %s',
+            (user_id,)
+        )
+        user = cursor.fetchone()
+    finally:
+        cursor.close()
+        connection.close()
     return user
 
 def create_user(username, email, password, full_name):
@@ -240,12 +583,38 @@ def get_user_watchlist(user_id):
     if connection is None:
         return []
     
-    cursor = connection.cursor()
-    cursor.execute('SELECT company_name FROM watchlists WHERE user_id = %s', (user_id,))
-    watchlist = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    connection.close()
-    return watchlist
+    try:
+        rows = run_prepared(connection, SQL_USER_WATCHLIST, (user_id,))
+    finally:
+        connection.close()
+    return [row[0] for row in rows]
+
+# Per-user counts shown on the profile page, briefly cached and dropped on writes
+_watchlist_count_cache = TTLCache(maxsize=4096, ttl=30)
+_analysis_count_cache = TTLCache(maxsize=4096, ttl=30)
+_history_stats_cache = TTLCache(maxsize=4096, ttl=30)
+_count_cache_lock = threading.Lock()
+
+def count_user_watchlist(user_id):
+    """Get the number of companies on a user's watchlist."""
+    with _count_cache_lock:
+        count = _watchlist_count_cache.get(user_id)
+    if count is not None:
+        return count
+    
+    connection = get_db_connection()
+    if connection is None:
+        return 0
+    
+    # Counted inside unique_user_company, whose leading column is user_id
+    try:
+        count = int(run_prepared(connection, SQL_COUNT_WATCHLIST, (user_id,))[0][0])
+    finally:
+        connection.close()
+    
+    with _count_cache_lock:
+        _watchlist_count_cache[user_id] = count
+    return count
 
 def add_to_user_watchlist(user_id, company):
     """Add company to user's watchlist."""
@@ -261,6 +630,8 @@ def add_to_user_watchlist(user_id, company):
         )
         connection.commit()
         success = True
+        with _count_cache_lock:
+            _watchlist_count_cache.pop(user_id, None)
     except Error:
         success = False  # Company already in watchlist or other error
         connection.rollback()
@@ -283,6 +654,8 @@ def remove_from_user_watchlist(user_id, company):
         )
         connection.commit()
         success = True
+        with _count_cache_lock:
+            _watchlist_count_cache.pop(user_id, None)
     except Error:
         success = False
         connection.rollback()
@@ -292,38 +665,78 @@ def remove_from_user_watchlist(user_id, company):
     return success
 
 # Analysis History Functions
-def save_analysis_to_history(session_id, company_name, ticker_symbol, analysis_date, 
-                            news_data, overall_signal, stock_info):
-    """Save complete analysis to history."""
+def _dumps_json(value):
+    """Serialize a value for a JSON column with orjson (numpy scalars included)."""
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY, default=str).decode()
+
+INSERT_ANALYSIS_SQL = '''
+    INSERT INTO analysis_history 
+    (user_id, session_id, company_name, ticker_symbol, analysis_date, overall_sentiment,
+     total_articles, positive_count, negative_count, neutral_count, sector, industry,
+     market_cap, country, correlation_summary, news_data, stock_info, analysis_token)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+'''
+
+INSERT_ARTICLE_SQL = '''
+    INSERT INTO analysis_articles (analysis_id, idx, title, sentiment, source, published_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+'''
+
+INSERT_STOCK_INFO_SQL = '''
+    INSERT INTO analysis_stock_info
+    (analysis_id, ticker_symbol, sector, industry, market_cap, country, employee_count,
+     website, average_correlation, market_influence)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+'''
+
+def _parse_article_datetime(date_str, time_str):
+    """Parse an article's DD-MM-YYYY display date and HH:MM time, or None if they aren't ones."""
+    try:
+        if time_str:
+            return datetime.strptime(f"{date_str} {time_str}", "%d-%m-%Y %H:%M")
+        return datetime.strptime(date_str, "%d-%m-%Y")
+    except (TypeError, ValueError):
+        return None
+
+def _correlation_summary(stock_info):
+    """Pick the headline correlation figures stored alongside an analysis."""
+    if not stock_info or not stock_info.get('correlation_analysis'):
+        return {}
+    return {
+        'total_analyzed': stock_info['correlation_analysis']['total_analyzed'],
+        'average_correlation': stock_info['correlation_analysis']['average_correlation'],
+        'market_influence': stock_info['correlation_analysis']['market_influence']
+    }
+
+def save_analysis_to_history(user_id, session_id, company_name, ticker_symbol, analysis_date, 
+                            news_data, overall_signal, stock_info, analysis_token=None):
+    """Save complete analysis to history.
+    
+    Takes the user id explicitly so it can run off the request thread, where
+    Flask's session is unavailable. The session's analysis_token is stored
+    with the row so later requests, in any worker, can find it.
+    """
     connection = get_db_connection()
     if connection is None:
         return False
     
+    # Plain cursor: a one-shot prepared statement would cost an extra prepare and
+    # deallocate round trip, and executemany folds the article rows into one INSERT
     cursor = connection.cursor()
     
     try:
-        # Calculate sentiment counts
-        positive_count = len([item for item in news_data if item.get('sentiment') == 'Positive'])
-        negative_count = len([item for item in news_data if item.get('sentiment') == 'Negative'])
-        neutral_count = len([item for item in news_data if item.get('sentiment') == 'Neutral'])
+        # Calculate sentiment counts in a single pass
+        sentiment_counts = Counter(item.get('sentiment') for item in news_data)
+        positive_count = sentiment_counts['Positive']
+        negative_count = sentiment_counts['Negative']
+        neutral_count = sentiment_counts['Neutral']
         
-        # Prepare correlation summary
-        correlation_summary = {}
-        if stock_info and stock_info.get('correlation_analysis'):
-            correlation_summary = {
-                'total_analyzed': stock_info['correlation_analysis']['total_analyzed'],
-                'average_correlation': stock_info['correlation_analysis']['average_correlation'],
-                'market_influence': stock_info['correlation_analysis']['market_influence']
-            }
+        correlation_summary = _correlation_summary(stock_info)
         
-        cursor.execute('''
-            INSERT INTO analysis_history 
-            (user_id, session_id, company_name, ticker_symbol, analysis_date, overall_sentiment,
-             total_articles, positive_count, negative_count, neutral_count, sector, industry,
-             market_cap, country, correlation_summary, news_data, stock_info)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ''', (
-            session.get('user_id'),
+        # The history row and its child rows are written in one transaction
+        connection.start_transaction()
+        cursor.execute(INSERT_ANALYSIS_SQL, (
+            user_id,
             session_id,
             company_name,
             ticker_symbol,
@@ -337,12 +750,48 @@ def save_analysis_to_history(session_id, company_name, ticker_symbol, analysis_d
             stock_info.get('industry', '') if stock_info else '',
             stock_info.get('market_cap', 0) if stock_info else 0,
             stock_info.get('country', '') if stock_info else '',
-            json.dumps(correlation_summary),
-            json.dumps(news_data),
-            json.dumps(stock_info) if stock_info else '{}'
+            _dumps_json(correlation_summary),
+            _dumps_json(news_data),
+            _dumps_json(stock_info) if stock_info else '{}',
+            analysis_token
         ))
         
+        analysis_id = cursor.lastrowid
+        if news_data:
+            cursor.executemany(INSERT_ARTICLE_SQL, [
+                (
+                    analysis_id,
+                    idx,
+                    item.get('title', '')[:512],
+                    item.get('sentiment') or 'Neutral',
+                    item.get('reference'),
+                    _parse_article_datetime(item.get('date'), item.get('time'))
+                )
+                for idx, item in enumerate(news_data)
+            ])
+        if stock_info:
+            cursor.execute(INSERT_STOCK_INFO_SQL, (
+                analysis_id,
+                ticker_symbol,
+                stock_info.get('sector', ''),
+                stock_info.get('industry', ''),
+                stock_info.get('market_cap', 0),
+                stock_info.get('country', ''),
+                stock_info.get('employee_count', 0),
+                (stock_info.get('website') or '')[:255],
+                correlation_summary.get('average_correlation'),
+                correlation_summary.get('market_influence')
+            ))
+        
         connection.commit()
+        with _count_cache_lock:
+            if user_id is None:
+                # Rows without a user show up in everyone's history
+                _analysis_count_cache.clear()
+                _history_stats_cache.clear()
+            else:
+                _analysis_count_cache.pop(user_id, None)
+                _history_stats_cache.pop(user_id, None)
         return True
         
     except Error as e:
@@ -350,95 +799,275 @@ def save_analysis_to_history(session_id, company_name, ticker_symbol, analysis_d
         connection.rollback()
         return False
     finally:
+        # Pooled connections are not reset on check-in, so never return one mid-transaction
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except Error as e:
+            print(f"Error rolling back analysis save: {e}")
         cursor.close()
         connection.close()
 
-def get_user_analysis_history(user_id, limit=20):
-    """Get user's analysis history."""
+# History writes run in the background so pages don't wait on the insert
+_SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="history-save")
+
+def _report_save_failure(future):
+    """Print exceptions from background saves, which would otherwise be dropped."""
+    error = future.exception()
+    if error is not None:
+        print(f"Error saving analysis to history: {error}")
+
+def save_analysis_in_background(*args):
+    """Queue save_analysis_to_history(*args) on the background save pool."""
+    _SAVE_EXECUTOR.submit(save_analysis_to_history, *args).add_done_callback(_report_save_failure)
+
+ANALYSIS_METADATA_COLUMNS = '''
+    id, company_name, ticker_symbol, analysis_date, overall_sentiment,
+    total_articles, positive_count, negative_count, neutral_count,
+    sector, industry, market_cap, country, correlation_summary
+'''
+
+def get_user_analysis_history(user_id, limit=20, offset=0):
+    """Get one page of a user's analysis history, newest first."""
     connection = get_db_connection()
     if connection is None:
         return []
     
-    cursor = connection.cursor()
-    cursor.execute('''
-        SELECT id, company_name, ticker_symbol, analysis_date, overall_sentiment,
-               total_articles, sector, industry, market_cap, country, created_at
-        FROM analysis_history 
-        WHERE user_id = %s OR user_id IS NULL
-        ORDER BY created_at DESC 
-        LIMIT %s
-    ''', (user_id, limit))
-    
-    results = cursor.fetchall()
-    cursor.close()
-    connection.close()
-    
-    history = []
-    for row in results:
-        history.append({
-            'id': row[0],
-            'company_name': row[1],
-            'ticker_symbol': row[2],
-            'analysis_date': row[3].strftime('%Y-%m-%d') if row[3] else '',
-            'overall_sentiment': row[4],
-            'total_articles': row[5],
-            'sector': row[6],
-            'industry': row[7],
-            'market_cap': row[8],
-            'country': row[9],
-            'created_at': row[10].strftime('%B %d, %Y') if row[10] else ''
-        })
+    # Each branch reads newest-first straight off idx_user_created (NULLs included),
+    # so no OR merge or filesort over the whole table; each supplies enough rows
+    # for the requested page and the merged result is paged once. id breaks
+    # created_at ties so pages don't repeat or skip rows; InnoDB secondary
+    # indexes end with the primary key, so the index already covers that order
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute('''
+            (SELECT id, company_name, ticker_symbol, analysis_date, overall_sentiment,
+                    total_articles, sector, industry, market_cap, country, created_at
+             FROM analysis_history
+             WHERE user_id = %s
+             ORDER BY created_at DESC, id DESC
+             LIMIT %s)
+            UNION ALL
+            (SELECT id, company_name, ticker_symbol, analysis_date, overall_sentiment,
+                    total_articles, sector, industry, market_cap, country, created_at
+             FROM analysis_history
+             WHERE user_id IS NULL
+             ORDER BY created_at DESC, id DESC
+             LIMIT %s)
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s OFFSET %s
+        ''', (user_id, offset + limit, offset + limit, limit, offset))
+        history = cursor.fetchall()
+    finally:
+        cursor.close()
+        connection.close()
+    
+    for row in history:
+        row['analysis_date'] = row['analysis_date'].strftime('%Y-%m-%d') if row['analysis_date'] else ''
+        row['created_at'] = row['created_at'].strftime('%B %d, %Y') if row['created_at'] else ''
     
     return history
 
-def get_analysis_by_id(analysis_id, user_id):
-    """Get specific analysis by ID."""
+def count_user_analyses(user_id):
+    """Get the number of analyses in a user's history (including ones saved without a user)."""
+    with _count_cache_lock:
+        count = _analysis_count_cache.get(user_id)
+    if count is not None:
+        return count
+    
+    connection = get_db_connection()
+    if connection is None:
+        return 0
+    
+    # Both counts are answered from idx_user_created
+    try:
+        count = int(run_prepared(connection, SQL_COUNT_ANALYSES, (user_id,))[0][0])
+    finally:
+        connection.close()
+    
+    with _count_cache_lock:
+        _analysis_count_cache[user_id] = count
+    return count
+
+def get_user_history_stats(user_id):
+    """Get totals over a user's whole analysis history for the history page's stat cards and chart."""
+    with _count_cache_lock:
+        stats = _history_stats_cache.get(user_id)
+    if stats is not None:
+        return stats
+    
+    stats = {'total_analyses': 0, 'total_articles': 0, 'sectors_covered': 0, 'latest_analysis': 'N/A',
+             'positive': 0, 'negative': 0, 'neutral': 0}
     connection = get_db_connection()
     if connection is None:
-        return None
+        return stats
     
+    # Same two index branches as get_user_analysis_history, aggregated once
     cursor = connection.cursor()
-    cursor.execute('''
-        SELECT * FROM analysis_history 
-        WHERE id = %s AND (user_id = %s OR user_id IS NULL)
-    ''', (analysis_id, user_id))
-    
-    result = cursor.fetchone()
-    cursor.close()
-    connection.close()
-    
-    if result:
-        return {
-            'id': result[0],
-            'company_name': result[3],
-            'ticker_symbol': result[4],
-            'analysis_date': result[5],
-            'overall_sentiment': result[6],
-            'total_articles': result[7],
-            'positive_count': result[8],
-            'negative_count': result[9],
-            'neutral_count': result[10],
-            'sector': result[11],
-            'industry': result[12],
-            'market_cap': result[13],
-            'country': result[14],
-            'correlation_summary': json.loads(result[15]) if result[15] else {},
-            'news_data': json.loads(result[16]) if result[16] else [],
-            'stock_info': json.loads(result[17]) if result[17] else {}
-        }
+    try:
+        cursor.execute('''
+            SELECT COUNT(*), COALESCE(SUM(total_articles), 0), COUNT(DISTINCT NULLIF(sector, '')),
+                   MAX(created_at),
+                   COALESCE(SUM(overall_sentiment = 'Positive'), 0),
+                   COALESCE(SUM(overall_sentiment = 'Negative'), 0),
+                   COALESCE(SUM(overall_sentiment = 'Neutral'), 0)
+            FROM ((SELECT total_articles, sector, created_at, overall_sentiment
+                   FROM analysis_history WHERE user_id = %s)
+                  UNION ALL
+                  (SELECT total_articles, sector, created_at, overall_sentiment
+                   FROM analysis_history WHERE user_id IS NULL)) AS history
+        ''', (user_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        connection.close()
     
-    return None
+    total, articles, sectors, latest, positive, negative, neutral = row
+    stats = {
+        'total_analyses': int(total),
+        'total_articles': int(articles),
+        'sectors_covered': int(sectors),
+        'latest_analysis': latest.strftime('%B %d, %Y') if latest else 'N/A',
+        'positive': int(positive),
+        'negative': int(negative),
+        'neutral': int(neutral)
+    }
+    with _count_cache_lock:
+        _history_stats_cache[user_id] = stats
+    return stats
+
+def get_analysis_detail(analysis_id, user_id, article_limit=10, include_stock_info=True):
+    """Get a specific analysis including its stock info and first stored news articles."""
+    # Without the stock info blob only a flag saying whether one was stored is selected
+    stock_info_column = 'stock_info' if include_stock_info else 'COALESCE(JSON_LENGTH(stock_info), 0) > 0 AS has_stock_info'
+    
+    connection = get_db_connection()
+    if connection is None:
+        return None
+    
+    # MySQL slices the stored article array and counts it, so only the
+    # articles we display are sent over and decoded
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(f'''
+            SELECT {ANALYSIS_METADATA_COLUMNS},
+                   JSON_EXTRACT(news_data, CONCAT('$[0 to ', %s, ']')) AS news_data,
+                   JSON_LENGTH(news_data) AS news_count,
+                   {stock_info_column}
+            FROM analysis_history 
+            WHERE id = %s AND (user_id = %s OR user_id IS NULL)
+        ''', (article_limit - 1, analysis_id, user_id))
+        analysis = cursor.fetchone()
+    finally:
+        cursor.close()
+        connection.close()
+    
+    if analysis:
+        analysis['correlation_summary'] = orjson.loads(analysis['correlation_summary']) if analysis['correlation_summary'] else {}
+        analysis['news_data'] = orjson.loads(analysis['news_data']) if analysis['news_data'] else []
+        analysis['news_count'] = analysis['news_count'] or 0
+        if include_stock_info:
+            analysis['stock_info'] = orjson.loads(analysis['stock_info']) if analysis['stock_info'] else {}
+        else:
+            analysis['has_stock_info'] = bool(analysis['has_stock_info'])
+    return analysis
+
+def get_saved_stock_info(analysis_token, user_id):
+    """Get (analysis id, stock info) saved for a user's analysis token.
+    
+    The id is None if the analysis isn't saved (yet), and the stock info is
+    None if it was saved without usable stock info.
+    """
+    connection = get_db_connection()
+    if connection is None:
+        return None, None
+    
+    try:
+        rows = run_prepared(connection, SQL_SAVED_STOCK_INFO, (user_id, analysis_token))
+    finally:
+        connection.close()
+    if not rows:
+        return None, None
+    
+    analysis_id, stock_info = rows[0]
+    stock_info = orjson.loads(stock_info) if stock_info else None
+    # Saved placeholders from failed lookups don't count
+    if not stock_info or stock_info.get('error'):
+        return analysis_id, None
+    return analysis_id, stock_info
+
+def update_saved_stock_info(analysis_id, user_id, stock_info):
+    """Replace the stock info and correlation summary stored with one of a user's analyses."""
+    connection = get_db_connection()
+    if connection is None:
+        return False
+    
+    cursor = connection.cursor()
+    try:
+        correlation_summary = _correlation_summary(stock_info)
+        # The analysis_stock_info row (absent for saves without stock info) is kept in step
+        cursor.execute('''
+            UPDATE analysis_history h
+            LEFT JOIN analysis_stock_info s ON s.analysis_id = h.id
+            SET h.stock_info = %s, h.correlation_summary = %s,
+                s.average_correlation = %s, s.market_influence = %s
+            WHERE h.id = %s AND h.user_id = %s
+        ''', (
+            _dumps_json(stock_info),
+            _dumps_json(correlation_summary),
+            correlation_summary.get('average_correlation'),
+            correlation_summary.get('market_influence'),
+            analysis_id,
+            user_id
+        ))
+        return cursor.rowcount > 0
+    except Error as e:
+        print(f"Error updating saved stock info: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+def get_analysis_summary_by_id(analysis_id, user_id, article_limit=10):
+    """Get what the analysis page displays: metadata and the first articles, without the stock info blob."""
+    return get_analysis_detail(analysis_id, user_id, article_limit, include_stock_info=False)
 
 # Session helper functions
 def save_analysis_session(company, analysis_date, ticker_symbol=None):
     """Save analysis session for multi-page navigation."""
-    session_id = session.get('session_id', os.urandom(16).hex())
-    session['session_id'] = session_id
+    session_id = session.get('session_id')
+    if not session_id:
+        session_id = secrets.token_hex(16)
+        session['session_id'] = session_id
     session['last_company'] = company
     session['last_date'] = analysis_date
     session['last_ticker'] = ticker_symbol
+    # Stored with this analysis's history row so any worker can find it once saved
+    session['analysis_token'] = secrets.token_hex(8)
     return session_id
 
+# Stock info per (session, company) so the news, correlation and domain pages
+# share one lookup; kept server-side because it is too large for the cookie
+SESSION_STOCK_INFO_TTL = 600
+_session_stock_info = TTLCache(maxsize=1024, ttl=SESSION_STOCK_INFO_TTL)
+_session_stock_info_lock = threading.Lock()
+
+def get_session_stock_info(company, refresh=False):
+    """Get comprehensive stock info for a company, reusing this session's recent lookup unless refreshing."""
+    key = (session.get('session_id'), company.strip().lower())
+    with _session_stock_info_lock:
+        stock_info = None if refresh else _session_stock_info.get(key)
+    if stock_info is not None:
+        return stock_info
+    
+    stock_info = get_comprehensive_stock_info(company, refresh=refresh)
+    # Stock info isn't modified after this, so the fetch time versions it (it is saved with it too)
+    stock_info['fetched_at'] = time.time()
+    if not stock_info.get('error'):
+        with _session_stock_info_lock:
+            _session_stock_info[key] = stock_info
+    return stock_info
+
 def get_current_analysis():
     """Get current analysis session data."""
     return {
@@ -513,94 +1142,118 @@ def remove_from_watchlist(company):
         return True
 
 # Core analysis functions
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+NEWS_PAGE_SIZE = 100
+# The free NewsAPI plan serves at most 100 results, i.e. a single page
+NEWS_MAX_ARTICLES = int(os.getenv("NEWS_MAX_ARTICLES", 100))
+
+# Keep-alive session for NewsAPI; transient failures are retried with backoff
+# and the final response is still returned so its status can be reported
+NEWS_SESSION = make_session(
+    pool_maxsize=10,
+    retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504), raise_on_status=False),
+    browser=False
+)
+
+def fetch_news_page(company, from_date_str, to_date_str, page):
+    """Request one page of NewsAPI results for a company."""
+    params = {
+        "q": f'"{company}"',
+        "apiKey": API_KEY,
+        "language": "en",
+        "from": from_date_str,
+        "to": to_date_str,
+        "sortBy": "publishedAt",
+        "pageSize": NEWS_PAGE_SIZE,
+        "page": page
+    }
+    return NEWS_SESSION.get(NEWS_API_URL, params=params, timeout=10)
+
+def format_published_at(raw_date):
+    """Split a NewsAPI publishedAt timestamp into DD-MM-YYYY and HH:MM display strings."""
+    # NewsAPI sends fixed-layout ISO timestamps (YYYY-MM-DDTHH:MM:SSZ), so slice
+    # them directly; the local date/time is kept as given, like fromisoformat did
+    if not isinstance(raw_date, str):
+        # publishedAt can be missing or null
+        return raw_date, ""
+    if (len(raw_date) >= 16 and raw_date[4] == '-' and raw_date[7] == '-'
+            and raw_date[10] == 'T' and raw_date[13] == ':'
+            and (raw_date[:4] + raw_date[5:7] + raw_date[8:10] + raw_date[11:13] + raw_date[14:16]).isdigit()):
+        return f"{raw_date[8:10]}-{raw_date[5:7]}-{raw_date[:4]}", raw_date[11:16]
+    
+    try:
+        date_obj = datetime.fromisoformat(raw_date.replace("Z", "+00:00"))
+        return date_obj.strftime("%d-%m-%Y"), date_obj.strftime("%H:%M")
+    except Exception:
+        return raw_date, ""
+
 def fetch_news_only(company, from_date_str, to_date_str):
     """Fetch only news articles without sentiment analysis."""
     load_models()
     
-    company_embedding = sbert_model.encode(company, convert_to_tensor=True)
-    url = "https://newsapi.org/v2/everything"
-    page = 1
-    page_size = 100
-    all_articles = []
-    
-    max_articles = 100  # Limit to 100 results max for free API plan
-    while len(all_articles) < max_articles:
-        params = {
-            "q": f'"{company}"',
-            "apiKey": API_KEY,
-            "language": "en",
-            "from": from_date_str,
-            "to": to_date_str,
-            "sortBy": "publishedAt",
-            "pageSize": page_size,
-            "page": page
-        }
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
-            # Log full response content for debugging
-            print(f"News API error {response.status_code}: {response.text}")
-            return [], f"Error fetching news: {response.status_code} - {response.text}"
-        data = response.json()
-        articles = data.get("articles", [])
-        if not articles:
-            break
-        all_articles.extend(articles)
-        if len(all_articles) >= max_articles:
-            all_articles = all_articles[:max_articles]
-            break
-        # Stop pagination after first page to avoid exceeding 100 results limit
-        break
-        # if page * page_size >= data.get("totalResults", 0):
-        #     break
-        # page += 1
-        # time.sleep(1)
-    
-    # SBERT semantic filtering
+    company_embedding = encode_company(company)
+    
+    # First page tells us how many results exist; any further pages are fetched in parallel
+    response = fetch_news_page(company, from_date_str, to_date_str, 1)
+    if response.status_code != 200:
+        # Log full response content for debugging
+        print(f"News API error {response.status_code}: {response.text}")
+        return [], f"Error fetching news: {response.status_code} - {response.text}"
+    data = orjson.loads(response.content)
+    all_articles = data.get("articles", [])
+    
+    available = min(data.get("totalResults", 0), NEWS_MAX_ARTICLES)
+    remaining_pages = range(2, -(-available // NEWS_PAGE_SIZE) + 1)
+    if all_articles and remaining_pages:
+        with ThreadPoolExecutor(max_workers=min(len(remaining_pages), 5)) as executor:
+            responses = executor.map(
+                lambda page: fetch_news_page(company, from_date_str, to_date_str, page),
+                remaining_pages
+            )
+            for page, response in zip(remaining_pages, responses):
+                if response.status_code != 200:
+                    # Keep what we have rather than failing the whole analysis
+                    print(f"News API error {response.status_code} on page {page}: {response.text}")
+                    break
+                all_articles.extend(orjson.loads(response.content).get("articles", []))
+    all_articles = all_articles[:NEWS_MAX_ARTICLES]
+    
+    # SBERT semantic filtering: encode all titles in one batch; with normalized
+    # embeddings a single matrix-vector product gives every cosine similarity
     SIMILARITY_THRESHOLD = 0.3
+    titled_articles = [article for article in all_articles if article.get("title")]
+    if not titled_articles:
+        return [], None
+    title_embeddings = encode_titles([article["title"] for article in titled_articles])
+    similarities = title_embeddings @ company_embedding
+    
+    # Select relevant articles with one vectorized comparison; only the survivors are formatted
+    relevant = torch.nonzero(similarities >= SIMILARITY_THRESHOLD).flatten().tolist()
+    
     filtered_articles = []
-    for article in all_articles:
-        title = article.get("title", "")
-        if not title:
-            continue
-        title_embedding = sbert_model.encode(title, convert_to_tensor=True)
-        similarity = util.cos_sim(company_embedding, title_embedding).item()
-        if similarity >= SIMILARITY_THRESHOLD:
-            # Format article data
-            raw_date = article["publishedAt"]
-            try:
-                date_obj = datetime.fromisoformat(raw_date.replace("Z", "+00:00"))
-                formatted_date = date_obj.strftime("%d-%m-%Y")
-                formatted_time = date_obj.strftime("%H:%M")
-            except Exception:
-                formatted_date = raw_date
-                formatted_time = ""
-            
-            filtered_articles.append({
-                "title": title,
-                "date": formatted_date,
-                "time": formatted_time,
-                "reference": article["source"]["name"],
-                "description": article.get("description", "")[:200] + "..." if article.get("description") else "",
-                "url": article.get("url", ""),
-                "image": article.get("urlToImage", ""),
-                "author": article.get("author", "Unknown")
-            })
+    for i in relevant:
+        article = titled_articles[i]
+        title = article["title"]
+        # Format article data
+        formatted_date, formatted_time = format_published_at(article.get("publishedAt"))
+        
+        filtered_articles.append({
+            "title": title,
+            "date": formatted_date,
+            "time": formatted_time,
+            "reference": article["source"]["name"],
+            "description": article.get("description", "")[:200] + "..." if article.get("description") else "",
+            "url": article.get("url", ""),
+            "image": article.get("urlToImage", ""),
+            "author": article.get("author", "Unknown")
+        })
     
     return filtered_articles, None
 
-def analyze_sentiment_only(company, from_date_str, to_date_str):
-    """Perform sentiment analysis on news articles."""
-    load_models()
-    
-    articles, error = fetch_news_only(company, from_date_str, to_date_str)
-    if error:
-        return [], None, 0, error
-    
-    # Sentiment analysis
-    news_data = []
-    for article in articles:
-        title = article["title"]
-        sentiment_label = sentiment_analyzer(title)[0]["label"].upper()
+def label_articles(articles):
+    """Set each article's sentiment, classifying all their titles in one batched pass."""
+    labels = classify_titles([article["title"] for article in articles])
+    for article, sentiment_label in zip(articles, labels):
         if sentiment_label == "POSITIVE":
             sentiment_signal = "Positive"
         elif sentiment_label == "NEGATIVE":
@@ -609,15 +1262,26 @@ def analyze_sentiment_only(company, from_date_str, to_date_str):
             sentiment_signal = "Neutral"
         
         article["sentiment"] = sentiment_signal
-        news_data.append(article)
+    return articles
+
+def analyze_sentiment_only(company, from_date_str, to_date_str):
+    """Perform sentiment analysis on news articles."""
+    load_models()
+    
+    articles, error = fetch_news_only(company, from_date_str, to_date_str)
+    if error:
+        return [], None, 0, error
+    
+    # Sentiment analysis, batched across all uncached titles
+    news_data = label_articles(articles)
     
     # Calculate overall sentiment
-    df = pd.DataFrame([{"sentiment": article["sentiment"]} for article in news_data])
-    if df.empty:
+    if not news_data:
         return [], None, 0, None
     
-    positive = (df["sentiment"] == "Positive").sum()
-    negative = (df["sentiment"] == "Negative").sum()
+    sentiment_counts = Counter(article["sentiment"] for article in news_data)
+    positive = sentiment_counts["Positive"]
+    negative = sentiment_counts["Negative"]
     if positive > negative:
         overall_signal = "Positive"
     elif negative > positive:
@@ -748,10 +1412,11 @@ def index():
                 flash(str(e), 'error')
                 return render_template('index.html', watchlist=get_watchlist(), recent_analyses=[], user_name=session.get('full_name'))
 
-            stock_info = get_comprehensive_stock_info(company)
-            session['last_date'] = analysis_date
+            session_id = save_analysis_session(company, analysis_date)
             session['last_time_period'] = date_input
-            session_id = save_analysis_session(company, analysis_date, stock_info.get('ticker'))
+            # Goes through the session cache so the news, correlation and domain pages reuse it
+            stock_info = get_session_stock_info(company)
+            session['last_ticker'] = stock_info.get('ticker')
 
             # Redirect to latest_news with explicit from/to ISO datetimes so the news page
             # can immediately fetch the correct interval (avoids any ambiguity)
@@ -800,6 +1465,19 @@ def latest_news():
         except Exception:
             flash("Invalid date range provided", "error")
             return redirect(url_for('latest_news'))
+        
+        # A reversed range can't match any article, so skip the news fetch and models
+        if from_dt.astimezone(timezone.utc) > to_dt.astimezone(timezone.utc):
+            return render_template("latest_news.html",
+                                   results=[],
+                                   overall_signal=None,
+                                   total=0,
+                                   error="Invalid date range",
+                                   company=company,
+                                   date_input=analysis_date,
+                                   from_date=from_d,
+                                   to_date=to_d,
+                                   user_name=session.get("full_name"))
     elif time_period:
         from_d, to_d, _ = get_date_range(time_period)
     else:
@@ -821,18 +1499,20 @@ def latest_news():
     )
     
     # Get stock info for saving to history
-    stock_info = get_comprehensive_stock_info(company)
+    stock_info = get_session_stock_info(company)
     
-    # Save complete analysis to history
+    # Save complete analysis to history; session values are read here on the request thread
     if results and not error and 'user_id' in session:
-        save_analysis_to_history(
+        save_analysis_in_background(
+            session['user_id'],
             session.get('session_id'),
             company,
             stock_info.get('ticker') if stock_info else None,
             analysis_date,
             results,
             overall_signal,
-            stock_info
+            stock_info,
+            session.get('analysis_token')
         )
     
     return render_template("latest_news.html",
@@ -846,6 +1526,25 @@ def latest_news():
                            to_date=to_d,
                            user_name=session.get("full_name"))
 
+def render_stock_page(template, **context):
+    """Render a stock info page with an ETag so unchanged revisits get a 304 without rendering."""
+    stock_info = context.get("stock_info")
+    if not stock_info or stock_info.get("error") or not stock_info.get("fetched_at"):
+        # Failed lookups and analyses saved before fetch times were recorded aren't cached
+        return render_template(template, **context)
+    
+    # The stock info's fetch time plus the page's small scalar values identify what would be rendered
+    version = "|".join(f"{key}={value}" for key, value in sorted(context.items()) if key != "stock_info")
+    etag = hashlib.md5(f"{template}|{stock_info['fetched_at']}|{version}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = make_response(render_template(template, **context))
+    response.set_etag(etag)
+    # The URL is the same for every company, so browsers must revalidate rather than reuse blindly
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
 # PAGE 2: Stock Correlations (Which other stocks they affect)
 @app.route("/stock-correlations")
 def stock_correlations():
@@ -855,13 +1554,30 @@ def stock_correlations():
         flash("Please perform a stock analysis first", "error")
         return redirect(url_for('index'))
     
-    # Get comprehensive stock info with correlations
-    stock_info = get_comprehensive_stock_info(current_analysis['company'])
+    # Reuse the correlations saved with this analysis unless a refresh is requested
+    refresh = request.args.get('refresh') == '1'
+    analysis_id = stock_info = None
+    if 'user_id' in session and session.get('analysis_token'):
+        analysis_id, stock_info = get_saved_stock_info(session['analysis_token'], session['user_id'])
+    if refresh:
+        stock_info = None
+    from_history = stock_info is not None
     
-    return render_template("stock_correlations.html",
-                           stock_info=stock_info,
-                           company=current_analysis['company'],
-                           user_name=session.get("full_name"))
+    refresh_saved = False
+    if stock_info is None:
+        # Get comprehensive stock info with correlations; a refresh skips the
+        # profile and price caches and replaces the saved copy
+        stock_info = get_session_stock_info(current_analysis['company'], refresh=refresh)
+        if refresh and analysis_id and not stock_info.get('error'):
+            refresh_saved = update_saved_stock_info(analysis_id, session['user_id'], stock_info)
+    
+    return render_stock_page("stock_correlations.html",
+                             stock_info=stock_info,
+                             company=current_analysis['company'],
+                             from_history=from_history,
+                             refreshed=refresh,
+                             refresh_saved=refresh_saved,
+                             user_name=session.get("full_name"))
 
 # PAGE 3: Stock Domain/Sector Information
 @app.route("/stock-domain")
@@ -873,29 +1589,44 @@ def stock_domain():
         return redirect(url_for('index'))
     
     # Get comprehensive stock info
-    stock_info = get_comprehensive_stock_info(current_analysis['company'])
+    stock_info = get_session_stock_info(current_analysis['company'])
     
-    return render_template("stock_domain.html",
-                           stock_info=stock_info,
-                           company=current_analysis['company'],
-                           user_name=session.get("full_name"))
+    return render_stock_page("stock_domain.html",
+                             stock_info=stock_info,
+                             company=current_analysis['company'],
+                             user_name=session.get("full_name"))
 
 # Analysis History Routes
+HISTORY_PAGE_SIZE = 20
+
 @app.route("/analysis-history")
 @login_required
 def analysis_history():
-    """Display user's analysis history."""
-    history = get_user_analysis_history(session['user_id'], limit=50)
+    """Display one page of the user's analysis history."""
+    page = max(request.args.get('page', 1, type=int), 1)
+    offset = (page - 1) * HISTORY_PAGE_SIZE
+    
+    # One extra row tells us whether an older page exists
+    history = get_user_analysis_history(session['user_id'],
+                                        limit=HISTORY_PAGE_SIZE + 1,
+                                        offset=offset)
+    if not history and page > 1:
+        return redirect(url_for('analysis_history'))
+    has_next = len(history) > HISTORY_PAGE_SIZE
     
     return render_template("analysis_history.html",
-                           history=history,
+                           history=history[:HISTORY_PAGE_SIZE],
+                           page=page,
+                           offset=offset,
+                           has_next=has_next,
+                           stats=get_user_history_stats(session['user_id']),
                            user_name=session.get("full_name"))
 
 @app.route("/view-analysis/<int:analysis_id>")
 @login_required
 def view_analysis(analysis_id):
     """View a specific historical analysis."""
-    analysis = get_analysis_by_id(analysis_id, session['user_id'])
+    analysis = get_analysis_summary_by_id(analysis_id, session['user_id'])
     
     if not analysis:
         flash("Analysis not found", "error")
@@ -909,7 +1640,7 @@ def view_analysis(analysis_id):
 @login_required
 def download_analysis(analysis_id):
     """Download a specific analysis report as JSON."""
-    analysis = get_analysis_by_id(analysis_id, session['user_id'])
+    analysis = get_analysis_detail(analysis_id, session['user_id'])
     
     if not analysis:
         flash("Analysis not found", "error")
@@ -933,14 +1664,13 @@ def download_analysis(analysis_id):
         "market_cap": analysis['market_cap'],
         "country": analysis['country'],
         "correlation_summary": analysis['correlation_summary'],
-        "news_data": analysis['news_data'][:10],  # Limit news to top 10 for file size
+        "news_data": analysis['news_data'],  # First 10 articles only, to limit file size
         "stock_info": analysis['stock_info'],
         "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
     
-    # Create JSON response for download
-    from flask import make_response
-    response = make_response(json.dumps(report_data, indent=2, default=str))
+    # Create JSON response for download; orjson writes the date fields natively
+    response = make_response(orjson.dumps(report_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     response.headers["Content-Disposition"] = f"attachment; filename=analysis_{analysis_id}_{analysis['company_name'].replace(' ', '_')}.json"
     response.headers["Content-Type"] = "application/json"
     
@@ -958,10 +1688,23 @@ def watchlist():
                              user_name=session.get("full_name"))
     
     date_input = request.args.get("date", datetime.now().strftime("%Y-%m-%d"))
-    from_d, to_d, _ = get_date_range(date_input)
-    for comp in wl:
-        results, overall_signal, total, _ = analyze_sentiment_only(comp, from_d, to_d)
-        if isinstance(results, list):  # Only add if no error
+    try:
+        from_d, to_d, _ = get_date_range(date_input)
+    except ValueError:
+        # Well-formed but impossible dates (e.g. 2024-02-30) get past the before_request check
+        flash("Invalid date, expected YYYY-MM-DD", "error")
+        return redirect(url_for("watchlist"))
+    
+    # Fetch every company's news concurrently so the requests overlap; map keeps watchlist order
+    load_models()
+    with ThreadPoolExecutor(max_workers=min(8, len(wl))) as executor:
+        fetched = list(executor.map(lambda comp: fetch_news_only(comp, from_d, to_d), wl))
+    
+    # Then classify all companies' headlines together in one batched pass
+    label_articles([article for articles, error in fetched if not error for article in articles])
+    
+    for comp, (results, error) in zip(wl, fetched):
+        if not error:  # Only add if no error
             for r in results:
                 r["company"] = comp
                 all_results.append(r)
@@ -988,7 +1731,7 @@ def get_correlation_analysis(ticker):
         load_models()
         
         # Get stock info first to determine sector
-        stock_info = get_comprehensive_stock_info(ticker)
+        stock_info = get_comprehensive_stock_info(ticker, include_summary=False)
         
         if stock_info.get('correlation_analysis'):
             return jsonify({
@@ -1050,26 +1793,18 @@ def add_to_watchlist_api():
 @login_required
 def profile():
     """User profile page."""
-    connection = get_db_connection()
-    if connection is None:
-        return redirect(url_for("login"))
-    
-    cursor = connection.cursor()
-    cursor.execute('SELECT * FROM users WHERE id = %s', (session["user_id"],))
-    user = cursor.fetchone()
-    cursor.close()
-    connection.close()
+    user = get_user_by_id(session["user_id"])
     
     if user:
         user_data = {
-            'id': user[0],
-            'username': user[1],
-            'email': user[2],
-            'full_name': user[4],
-            'created_at': str(user[5]) if user[5] else 'Unknown'
+            'id': user['id'],
+            'username': user['username'],
+            'email': user['email'],
+            'full_name': user['full_name'],
+            'created_at': str(user['created_at']) if user['created_at'] else 'Unknown'
         }
-        watchlist_count = len(get_user_watchlist(session["user_id"]))
-        analysis_count = len(get_user_analysis_history(session["user_id"], limit=1000))
+        watchlist_count = count_user_watchlist(session["user_id"])
+        analysis_count = count_user_analyses(session["user_id"])
         
         return render_template("profile.html", 
                              user=user_data, 
@@ -2,16 +2,88 @@
 Stock Information Module
 Fetches sector, industry, and other stock details using yfinance
 """
-import yfinance as yf
 import requests
 import json
+import re
+import threading
+import time
+from cachetools import TTLCache
+from types import MappingProxyType
 from typing import Dict, Optional, List
+from ticker_store import clear_ticker_store, get_stored_ticker, store_ticker
+from http_session import YAHOO_SESSION
+
+# Lookups keyed by normalized company name. Ticker symbols rarely change; the
+# stock details are refreshed more often. Failed lookups are never cached.
+_TICKER_CACHE = TTLCache(maxsize=2048, ttl=3600)
+_STOCK_INFO_CACHE = TTLCache(maxsize=1024, ttl=900)
+_CACHE_LOCK = threading.Lock()
+
+# Industry keywords per sector, in priority order: when an industry matches
+# several sectors the earliest one wins
+SECTOR_KEYWORDS = (
+    ('Technology', ('software', 'technology', 'internet', 'computer', 'semiconductor', 'electronics')),
+    ('Financial Services', ('bank', 'financial', 'insurance', 'credit', 'investment')),
+    ('Healthcare', ('pharmaceutical', 'biotechnology', 'medical', 'healthcare', 'drug')),
+    ('Energy', ('oil', 'gas', 'energy', 'petroleum', 'renewable')),
+    ('Consumer Cyclical', ('retail', 'consumer', 'food', 'beverage', 'restaurant')),
+    ('Industrials', ('manufacturing', 'industrial', 'aerospace', 'defense', 'transportation')),
+    ('Real Estate', ('real estate', 'property', 'reit')),
+    ('Utilities', ('utility', 'utilities', 'electric', 'water', 'power')),
+    ('Basic Materials', ('mining', 'materials', 'chemicals', 'steel', 'aluminum')),
+)
+
+_KEYWORD_TO_SECTOR = {keyword: sector for sector, keywords in SECTOR_KEYWORDS for keyword in keywords}
+_SECTOR_PRIORITY = {sector: rank for rank, (sector, _) in enumerate(SECTOR_KEYWORDS)}
+
+# One compiled alternation scans the industry once; the lookahead also
+# reports overlapping keywords (e.g. 'technology' inside 'biotechnology')
+_SECTOR_REGEX = re.compile('(?=(%s))' % '|'.join(map(re.escape, _KEYWORD_TO_SECTOR)))
+
+# yfinance pulls in pandas and numpy, so it is imported on first use rather than at module load
+_yf = None
+
+def _yfinance():
+    """Import yfinance on first use and return the module."""
+    global _yf
+    if _yf is None:
+        import yfinance
+        _yf = yfinance
+    return _yf
+
+def _cache_key(company_name: str) -> str:
+    return company_name.strip().lower()
+
+def clear_stock_caches() -> None:
+    """Drop all cached ticker symbols (persisted ones included) and stock details."""
+    with _CACHE_LOCK:
+        _TICKER_CACHE.clear()
+        _STOCK_INFO_CACHE.clear()
+    clear_ticker_store()
 
 def get_ticker_symbol(company_name: str) -> str:
     """
     Try to find a ticker symbol given a company name.
-    Uses Yahoo Finance search API.
+    Uses Yahoo Finance search API; results are cached for an hour.
     """
+    key = _cache_key(company_name)
+    with _CACHE_LOCK:
+        ticker_symbol = _TICKER_CACHE.get(key)
+    if ticker_symbol is not None:
+        return ticker_symbol
+    
+    # Resolutions persisted by an earlier process skip the Yahoo search
+    ticker_symbol = get_stored_ticker(key)
+    if not ticker_symbol:
+        ticker_symbol = _search_ticker_symbol(company_name)
+        if ticker_symbol:
+            store_ticker(key, ticker_symbol)
+    if ticker_symbol:
+        with _CACHE_LOCK:
+            _TICKER_CACHE[key] = ticker_symbol
+    return ticker_symbol
+
+def _search_ticker_symbol(company_name: str) -> str:
     try:
         # Clean company name
         clean_name = company_name.strip().replace(" ", "%20")
@@ -19,11 +91,7 @@ def get_ticker_symbol(company_name: str) -> str:
         # Yahoo Finance search endpoint
         url = f"https://query2.finance.yahoo.com/v1/finance/search?q={clean_name}&quotesCount=5&enableFuzzyQuery=false"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=5)
+        response = YAHOO_SESSION.get(url, timeout=5)
         
         if response.status_code == 200:
             data = response.json()
@@ -50,44 +118,137 @@ def get_ticker_symbol(company_name: str) -> str:
     # Fallback: try common company-to-ticker mapping
     return get_ticker_from_mapping(company_name)
 
+# Common mappings for well-known companies, read-only and built once
+_TICKER_MAPPING = MappingProxyType({
+    'apple': 'AAPL',
+    'microsoft': 'MSFT',
+    'google': 'GOOGL',
+    'alphabet': 'GOOGL',
+    'amazon': 'AMZN',
+    'tesla': 'TSLA',
+    'meta': 'META',
+    'facebook': 'META',
+    'netflix': 'NFLX',
+    'nvidia': 'NVDA',
+    'tcs': 'TCS.NS',
+    'infosys': 'INFY.NS',
+    'reliance': 'RELIANCE.NS',
+    'hdfc bank': 'HDFCBANK.NS',
+    'hdfc': 'HDFCBANK.NS',
+    'icici bank': 'ICICIBANK.NS',
+    'icici': 'ICICIBANK.NS',
+    'wipro': 'WIPRO.NS',
+    'bharti airtel': 'BHARTIARTL.NS',
+    'airtel': 'BHARTIARTL.NS',
+    'maruti suzuki': 'MARUTI.NS',
+    'maruti': 'MARUTI.NS'
+})
+
 def get_ticker_from_mapping(company_name: str) -> str:
     """
     Fallback method using common company name to ticker mapping
     """
-    # Common mappings for well-known companies
-    mapping = {
-        'apple': 'AAPL',
-        'microsoft': 'MSFT',
-        'google': 'GOOGL',
-        'alphabet': 'GOOGL',
-        'amazon': 'AMZN',
-        'tesla': 'TSLA',
-        'meta': 'META',
-        'facebook': 'META',
-        'netflix': 'NFLX',
-        'nvidia': 'NVDA',
-        'tcs': 'TCS.NS',
-        'infosys': 'INFY.NS',
-        'reliance': 'RELIANCE.NS',
-        'hdfc bank': 'HDFCBANK.NS',
-        'hdfc': 'HDFCBANK.NS',
-        'icici bank': 'ICICIBANK.NS',
-        'icici': 'ICICIBANK.NS',
-        'wipro': 'WIPRO.NS',
-        'bharti airtel': 'BHARTIARTL.NS',
-        'airtel': 'BHARTIARTL.NS',
-        'maruti suzuki': 'MARUTI.NS',
-        'maruti': 'MARUTI.NS'
-    }
-    
-    name_lower = company_name.lower().strip()
-    return mapping.get(name_lower, '')
+    return _TICKER_MAPPING.get(company_name.lower().strip(), '')
 
 def get_stock_sector(company_name: str) -> Dict:
     """
     Get comprehensive stock information including sector and industry.
     Returns a dictionary with ticker, sector, industry, and other details.
+    Successful lookups are cached for 15 minutes.
+    """
+    key = _cache_key(company_name or '')
+    with _CACHE_LOCK:
+        cached = _STOCK_INFO_CACHE.get(key)
+    if cached is not None:
+        return dict(cached)
+    
+    stock_info = _fetch_stock_sector(company_name)
+    # Only cache real answers, not the "Unknown" placeholders from failed lookups
+    if stock_info["ticker"] and (stock_info["sector"] != "Unknown" or stock_info["industry"] != "Unknown"):
+        with _CACHE_LOCK:
+            _STOCK_INFO_CACHE[key] = dict(stock_info)
+    return stock_info
+
+QUOTE_SUMMARY_URL = "https://query1.finance.yahoo.com/v10/finance/quoteSummary/{}"
+
+# quoteSummary needs Yahoo's session cookie plus the crumb issued for it. Both are
+# fetched once for YAHOO_SESSION and reused; after a failure the direct call is
+# skipped for a while so misses go straight to yfinance.
+YAHOO_COOKIE_URL = "https://fc.yahoo.com"
+YAHOO_CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+CRUMB_RETRY_AFTER = 600
+
+_crumb = None
+_crumb_failed_at = 0.0
+_crumb_lock = threading.Lock()
+
+def _get_yahoo_crumb() -> Optional[str]:
+    """Return the crumb for YAHOO_SESSION's cookie, fetching it on first use."""
+    global _crumb, _crumb_failed_at
+    with _crumb_lock:
+        if _crumb or time.time() - _crumb_failed_at < CRUMB_RETRY_AFTER:
+            return _crumb
+        try:
+            # Sets the session cookie; the page itself is an error page
+            YAHOO_SESSION.get(YAHOO_COOKIE_URL, timeout=5)
+            response = YAHOO_SESSION.get(YAHOO_CRUMB_URL, timeout=5)
+            crumb = response.text.strip()
+            if response.status_code == 200 and crumb and '<' not in crumb:
+                _crumb = crumb
+                return _crumb
+        except requests.RequestException as e:
+            print(f"Error fetching Yahoo crumb: {e}")
+        _crumb_failed_at = time.time()
+        return None
+
+def _drop_yahoo_crumb() -> None:
+    """Forget a crumb Yahoo has rejected and back off before fetching a new one."""
+    global _crumb, _crumb_failed_at
+    with _crumb_lock:
+        _crumb = None
+        _crumb_failed_at = time.time()
+
+def _fetch_quote_summary(ticker_symbol: str) -> Dict:
+    """
+    Fetch only the summaryProfile and price modules from Yahoo's quoteSummary
+    endpoint, flattened to the .info keys used below. Returns {} on any failure.
     """
+    crumb = _get_yahoo_crumb()
+    if not crumb:
+        return {}
+    
+    try:
+        response = YAHOO_SESSION.get(
+            QUOTE_SUMMARY_URL.format(ticker_symbol),
+            params={'modules': 'summaryProfile,price', 'crumb': crumb},
+            timeout=5
+        )
+        if response.status_code in (401, 403):
+            _drop_yahoo_crumb()
+            return {}
+        if response.status_code != 200:
+            return {}
+        result = (response.json().get('quoteSummary', {}).get('result') or [{}])[0]
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error fetching quote summary for {ticker_symbol}: {e}")
+        return {}
+    
+    profile = result.get('summaryProfile') or {}
+    market_cap = (result.get('price') or {}).get('marketCap')
+    if not profile:
+        return {}
+    
+    info = {key: profile[key] for key in ('sector', 'industry', 'country', 'website', 'fullTimeEmployees')
+            if profile.get(key)}
+    if isinstance(market_cap, dict) and market_cap.get('raw'):
+        info['marketCap'] = market_cap['raw']
+    # Keep one character past the display limit so the caller still adds its ellipsis
+    summary = profile.get('longBusinessSummary') or ''
+    if summary:
+        info['longBusinessSummary'] = summary[:501]
+    return info
+
+def _fetch_stock_sector(company_name: str) -> Dict:
     if not company_name or not company_name.strip():
         return {
             "ticker": "",
@@ -116,11 +277,10 @@ def get_stock_sector(company_name: str) -> Dict:
         }
     
     try:
-        # Create yfinance ticker object
-        stock = yf.Ticker(ticker_symbol)
-        
-        # Get stock info
-        info = stock.info
+        # Ask Yahoo for just the two modules we read; yfinance's full .info is the fallback
+        info = _fetch_quote_summary(ticker_symbol)
+        if not info:
+            info = _yfinance().Ticker(ticker_symbol, session=YAHOO_SESSION).info
         
         if not info:
             # If info is empty, try alternative approach
@@ -176,46 +336,8 @@ def infer_sector_from_industry(industry: str) -> str:
     """
     Infer sector from industry when sector information is not available
     """
-    industry_lower = industry.lower()
-    
-    # Technology sectors
-    if any(keyword in industry_lower for keyword in ['software', 'technology', 'internet', 'computer', 'semiconductor', 'electronics']):
-        return 'Technology'
-    
-    # Financial sectors
-    elif any(keyword in industry_lower for keyword in ['bank', 'financial', 'insurance', 'credit', 'investment']):
-        return 'Financial Services'
-    
-    # Healthcare sectors
-    elif any(keyword in industry_lower for keyword in ['pharmaceutical', 'biotechnology', 'medical', 'healthcare', 'drug']):
-        return 'Healthcare'
-    
-    # Energy sectors
-    elif any(keyword in industry_lower for keyword in ['oil', 'gas', 'energy', 'petroleum', 'renewable']):
-        return 'Energy'
-    
-    # Consumer sectors
-    elif any(keyword in industry_lower for keyword in ['retail', 'consumer', 'food', 'beverage', 'restaurant']):
-        return 'Consumer Cyclical'
-    
-    # Industrial sectors
-    elif any(keyword in industry_lower for keyword in ['manufacturing', 'industrial', 'aerospace', 'defense', 'transportation']):
-        return 'Industrials'
-    
-    # Real Estate
-    elif any(keyword in industry_lower for keyword in ['real estate', 'property', 'reit']):
-        return 'Real Estate'
-    
-    # Utilities
-    elif any(keyword in industry_lower for keyword in ['utility', 'utilities', 'electric', 'water', 'power']):
-        return 'Utilities'
-    
-    # Materials
-    elif any(keyword in industry_lower for keyword in ['mining', 'materials', 'chemicals', 'steel', 'aluminum']):
-        return 'Basic Materials'
-    
-    else:
-        return 'Unknown'
+    sectors = {_KEYWORD_TO_SECTOR[match.group(1)] for match in _SECTOR_REGEX.finditer(industry.lower())}
+    return min(sectors, key=_SECTOR_PRIORITY.get, default='Unknown')
 
 def format_market_cap(market_cap: int) -> str:
     """
@@ -0,0 +1,72 @@
+"""
+Ticker Lookup Store
+
+Persists company name -> ticker symbol resolutions in a small SQLite table so
+Yahoo search results survive process restarts and deploys.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+TICKER_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'tickers.sqlite3')
+
+# Resolutions older than this are looked up again
+TICKER_STORE_TTL = 30 * 24 * 3600
+
+_connection = None
+_lock = threading.Lock()
+
+def _get_connection() -> sqlite3.Connection:
+    """Open the shared connection and create the table on first use."""
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(TICKER_STORE_PATH), exist_ok=True)
+        connection = sqlite3.connect(TICKER_STORE_PATH, check_same_thread=False)
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS ticker_lookups (
+                name TEXT PRIMARY KEY,
+                ticker TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        ''')
+        connection.commit()
+        _connection = connection
+    return _connection
+
+def get_stored_ticker(name: str) -> str:
+    """Return the stored ticker for a normalized company name, or '' if missing or expired."""
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                'SELECT ticker FROM ticker_lookups WHERE name = ? AND resolved_at > ?',
+                (name, time.time() - TICKER_STORE_TTL)
+            ).fetchone()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error reading ticker store: {e}")
+        return ''
+    return row[0] if row else ''
+
+def store_ticker(name: str, ticker: str) -> None:
+    """Save a successful resolution for a normalized company name."""
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                'INSERT OR REPLACE INTO ticker_lookups (name, ticker, resolved_at) VALUES (?, ?, ?)',
+                (name, ticker, time.time())
+            )
+            connection.commit()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error writing ticker store: {e}")
+
+def clear_ticker_store() -> None:
+    """Drop all stored resolutions."""
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute('DELETE FROM ticker_lookups')
+            connection.commit()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error clearing ticker store: {e}")